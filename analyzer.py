@@ -3,10 +3,43 @@ analyzer.py - Job analysis and scoring using Ollama (mistral) with keyword-based
 Scores each job 0-100 based on relevance to user preferences.
 """
 
+import copy
+import hashlib
+import heapq
+import importlib.util
 import logging
 import os
 import re
 import json
+import multiprocessing
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, partial
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime as _datetime, timedelta
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# orjson parses the small Ollama responses and cached results several times
+# faster than the stdlib; both raise ValueError subclasses on bad input
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 logger = logging.getLogger(__name__)
 
@@ -93,12 +126,132 @@ IRRELEVANT_KEYWORDS = [
     "garment", "textile", "apparel", "food processing",
     "hvac", "plumbing", "welding", "carpentry",
 ]
+# Set form for the per-job disjointness check against matched keywords
+_IRRELEVANT_SET = frozenset(IRRELEVANT_KEYWORDS)
+
+# Funding stage -> phrases that indicate it
+_FUNDING_PATTERNS = {
+    "Pre-Seed": ["pre-seed", "pre seed"],
+    "Seed": ["seed stage", "seed funded", "seed round"],
+    "Series A": ["series a"],
+    "Series B": ["series b"],
+    "Series C": ["series c"],
+    "Series D+": ["series d", "series e", "series f"],
+    "IPO/Public": ["publicly traded", "listed on", "ipo", "nasdaq", "nyse", "bse", "nse listed"],
+    "Bootstrapped": ["bootstrapped", "self-funded", "profitable startup"],
+}
+
+# Size hints used by extract_company_info() when no headcount is stated
+_STARTUP_SIZE_KEYWORDS = ["startup", "early stage", "small team", "founding"]
+_ENTERPRISE_SIZE_KEYWORDS = ["fortune 500", "mnc", "global leader", "enterprise"]
+
+# Phrases detect_remote_status() treats as fully remote
+_REMOTE_STATUS_KEYWORDS = frozenset(["remote", "work from home", "wfh", "work from anywhere"])
+
+# Set forms for detect_company_type(), which counts matches in each
+_STARTUP_SET = frozenset(STARTUP_KEYWORDS)
+_CORPORATE_SET = frozenset(CORPORATE_KEYWORDS)
+
+# Every static literal keyword used by the detectors and keyword_score(),
+# matched in a single pass over the text.
+_LITERAL_KEYWORDS = (
+    set(REMOTE_KEYWORDS) | set(FINTECH_KEYWORDS) | set(PM_KEYWORDS)
+    | set(GROWTH_KEYWORDS) | set(IRRELEVANT_KEYWORDS)
+    | set(STARTUP_KEYWORDS) | set(CORPORATE_KEYWORDS)
+    | set(_STARTUP_SIZE_KEYWORDS) | set(_ENTERPRISE_SIZE_KEYWORDS)
+    | set(_REMOTE_STATUS_KEYWORDS) | {"hybrid"}
+    | {p for patterns in _FUNDING_PATTERNS.values() for p in patterns}
+)
+
+
+def _build_keyword_automaton(keywords):
+    """Build an Aho-Corasick automaton over keywords (None if pyahocorasick is missing)."""
+    if ahocorasick is None or not any(keywords):
+        return None
+    automaton = ahocorasick.Automaton()
+    for kw in keywords:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+_LITERAL_AUTOMATON = _build_keyword_automaton(_LITERAL_KEYWORDS)
+
+# Accumulating keyword_score() buckets and their caps
+_SCORE_BUCKETS = {
+    "industry": (FINTECH_KEYWORDS, 20),
+    "pm": (PM_KEYWORDS, 20),
+    "growth": (GROWTH_KEYWORDS, 10),
+}
+
+
+def _build_keyword_weights():
+    """Map each bucket keyword to its [(bucket, points), ...] contributions."""
+    weights = {}
+    for bucket, (table, _) in _SCORE_BUCKETS.items():
+        for kw, pts in table.items():
+            weights.setdefault(kw, []).append((bucket, pts))
+    return weights
+
+
+# Lets keyword_score() walk only the keywords a job matched instead of
+# every entry of every bucket table.
+_KEYWORD_WEIGHTS = _build_keyword_weights()
+
+
+def _find_keywords(text):
+    """Return the set of static literal keywords that occur as substrings of text."""
+    if _LITERAL_AUTOMATON is None:
+        return {kw for kw in _LITERAL_KEYWORDS if kw in text}
+    return {kw for _, kw in _LITERAL_AUTOMATON.iter(text)}
+
+
+@lru_cache(maxsize=32)
+def _terms_automaton(terms):
+    """Automaton over a frozenset of preference-derived terms, built once per term set."""
+    return _build_keyword_automaton(terms)
+
+
+def _find_terms(text, terms):
+    """Return the subset of terms (a frozenset of lowercase strings) that occur in text."""
+    automaton = _terms_automaton(terms)
+    if automaton is None:
+        return {t for t in terms if t in text}
+    found = {t for _, t in automaton.iter(text)}
+    if "" in terms:
+        found.add("")  # the empty string is a substring of everything
+    return found
 
 
 # =============================================================================
 # Experience & Salary extraction
 # =============================================================================
 
+_YEARS_RANGE_RE = re.compile(r'(\d{1,2})\s*(?:-|–|to)\s*(\d{1,2})\s*(?:years?|yrs?)')
+_YEARS_PLUS_RE = re.compile(r'(\d{1,2})\s*\+?\s*(?:plus\s+)?(?:years?|yrs?)')
+_YEARS_MIN_RE = re.compile(r'(?:minimum|at\s+least|min)\s*(\d{1,2})\s*(?:years?|yrs?)')
+_SALARY_NUMBER_RE = re.compile(r'(\d+(?:\.\d+)?)')
+_EMPLOYEES_RE = re.compile(r'(\d[\d,]*)\s*\+?\s*employees')
+_TEAM_OF_RE = re.compile(r'team\s+of\s+(\d[\d,]*)')
+_GLASSDOOR_RE = re.compile(r'glassdoor\s*(?:rating)?[:\s]*(\d(?:\.\d)?)')
+
+# Title-based experience inference: keyword -> (min_years, max_years)
+_TITLE_EXPERIENCE = {
+    "intern": (0, 1),
+    "fresher": (0, 2),
+    "junior": (0, 3),
+    "associate": (1, 4),
+    "mid": (3, 7),
+    "senior": (5, 12),
+    "staff": (7, 15),
+    "lead": (7, 15),
+    "principal": (10, 20),
+    "director": (10, 20),
+    "head": (10, 20),
+    "vp": (12, 25),
+}
+
+
 def extract_experience_years(text):
     """
     Extract experience range from job text.
@@ -107,52 +260,44 @@ def extract_experience_years(text):
     """
     if not text:
         return None, None
-    text_lower = text.lower()
+    return _experience_years_lower(text.lower())
 
+
+def _experience_years_lower(text_lower):
+    """extract_experience_years() for text that is already lowercased."""
     # Pattern: "5-10 years", "5 - 10 yrs"
-    m = re.search(r'(\d{1,2})\s*[-–to]+\s*(\d{1,2})\s*(?:years?|yrs?)', text_lower)
+    m = _YEARS_RANGE_RE.search(text_lower)
     if m:
         return int(m.group(1)), int(m.group(2))
 
     # Pattern: "3+ years", "3 plus years"
-    m = re.search(r'(\d{1,2})\s*\+?\s*(?:plus\s+)?(?:years?|yrs?)', text_lower)
+    m = _YEARS_PLUS_RE.search(text_lower)
     if m:
         val = int(m.group(1))
         return val, val + 5
 
     # Pattern: "minimum 5 years", "at least 5 years"
-    m = re.search(r'(?:minimum|at\s+least|min)\s*(\d{1,2})\s*(?:years?|yrs?)', text_lower)
+    m = _YEARS_MIN_RE.search(text_lower)
     if m:
         val = int(m.group(1))
         return val, val + 5
 
     # Title-based inference
-    title_experience = {
-        "intern": (0, 1),
-        "fresher": (0, 2),
-        "junior": (0, 3),
-        "associate": (1, 4),
-        "mid": (3, 7),
-        "senior": (5, 12),
-        "staff": (7, 15),
-        "lead": (7, 15),
-        "principal": (10, 20),
-        "director": (10, 20),
-        "head": (10, 20),
-        "vp": (12, 25),
-    }
-    for keyword, (lo, hi) in title_experience.items():
-        if keyword in text_lower.split()[:10]:  # Check title area only
+    title_words = text_lower.split()[:10]  # Check title area only
+    for keyword, (lo, hi) in _TITLE_EXPERIENCE.items():
+        if keyword in title_words:
             return lo, hi
 
     return None, None
 
 
+@lru_cache(maxsize=2048)
 def parse_salary_to_annual_inr(text, currency=None):
     """
     Parse salary text to (min_annual_inr, max_annual_inr).
     Handles: "INR 10-20 Lacs PA", "10-15 LPA", "$100k-$150k", "50,000/month"
     Returns (None, None) if unparseable.
+    Memoized: portals reuse a small set of salary strings across many jobs.
     """
     if not text:
         return None, None
@@ -164,17 +309,17 @@ def parse_salary_to_annual_inr(text, currency=None):
     multiplier = 83 if is_usd else 1  # Approximate USD to INR
 
     # Extract numbers
-    numbers = re.findall(r'(\d+(?:\.\d+)?)', text_lower)
+    numbers = _SALARY_NUMBER_RE.findall(text_lower)
     if not numbers:
         return None, None
 
     nums = [float(n) for n in numbers[:2]]
 
-    # Determine scale
-    is_monthly = "month" in text_lower or "/m" in text_lower or "per month" in text_lower
+    # Determine scale ("month" also covers "per month", "cr" covers "crore")
+    is_monthly = "month" in text_lower or "/m" in text_lower
     is_lakh = "lac" in text_lower or "lpa" in text_lower or "lakh" in text_lower or "l " in text_lower
     is_k = "k" in text_lower and not is_lakh
-    is_crore = "cr" in text_lower or "crore" in text_lower
+    is_crore = "cr" in text_lower
 
     scale = 1
     if is_crore:
@@ -184,16 +329,14 @@ def parse_salary_to_annual_inr(text, currency=None):
     elif is_k:
         scale = 1_000
 
-    results = [n * scale * multiplier for n in nums]
+    # Scaling by positive factors preserves order, so take min/max first
+    lo = min(nums) * scale * multiplier
+    hi = max(nums) * scale * multiplier
     if is_monthly:
-        results = [r * 12 for r in results]
+        lo, hi = lo * 12, hi * 12
 
-    # Return as integers (annual INR)
-    if len(results) >= 2:
-        return int(min(results)), int(max(results))
-    elif len(results) == 1:
-        return int(results[0]), int(results[0])
-    return None, None
+    # Return as integers (annual INR); a single number gives (n, n)
+    return int(lo), int(hi)
 
 
 def extract_company_info(text):
@@ -203,32 +346,23 @@ def extract_company_info(text):
     """
     if not text:
         return {}
-    text_lower = text.lower()
+    return _company_info_lower(text.lower())
+
+
+def _company_info_lower(text_lower):
+    """extract_company_info() for text that is already lowercased."""
+    found = _find_keywords(text_lower)
     info = {}
 
     # Funding stage detection
-    funding_patterns = {
-        "Pre-Seed": ["pre-seed", "pre seed"],
-        "Seed": ["seed stage", "seed funded", "seed round"],
-        "Series A": ["series a"],
-        "Series B": ["series b"],
-        "Series C": ["series c"],
-        "Series D+": ["series d", "series e", "series f"],
-        "IPO/Public": ["publicly traded", "listed on", "ipo", "nasdaq", "nyse", "bse", "nse listed"],
-        "Bootstrapped": ["bootstrapped", "self-funded", "profitable startup"],
-    }
-    for stage, patterns in funding_patterns.items():
-        if any(p in text_lower for p in patterns):
+    for stage, patterns in _FUNDING_PATTERNS.items():
+        if not found.isdisjoint(patterns):
             info["company_funding_stage"] = stage
             break
 
     # Company size
-    size_patterns = [
-        (r'(\d[\d,]*)\s*\+?\s*employees', None),
-        (r'team\s+of\s+(\d[\d,]*)', None),
-    ]
-    for pattern, _ in size_patterns:
-        m = re.search(pattern, text_lower)
+    for pattern in (_EMPLOYEES_RE, _TEAM_OF_RE):
+        m = pattern.search(text_lower)
         if m:
             count = int(m.group(1).replace(",", ""))
             if count < 50:
@@ -245,13 +379,13 @@ def extract_company_info(text):
 
     # Size from keywords if not found
     if "company_size" not in info:
-        if any(kw in text_lower for kw in ["startup", "early stage", "small team", "founding"]):
+        if not found.isdisjoint(_STARTUP_SIZE_KEYWORDS):
             info["company_size"] = "Startup (<50)"
-        elif any(kw in text_lower for kw in ["fortune 500", "mnc", "global leader", "enterprise"]):
+        elif not found.isdisjoint(_ENTERPRISE_SIZE_KEYWORDS):
             info["company_size"] = "Enterprise (10K+)"
 
     # Glassdoor rating mention
-    m = re.search(r'glassdoor\s*(?:rating)?[:\s]*(\d(?:\.\d)?)', text_lower)
+    m = _GLASSDOOR_RE.search(text_lower)
     if m:
         info["company_glassdoor_rating"] = m.group(1)
 
@@ -260,39 +394,98 @@ def extract_company_info(text):
 
 def detect_remote_status(text):
     """Detect whether a job is remote, hybrid, or on-site."""
-    text_lower = text.lower()
-    if any(kw in text_lower for kw in ["remote", "work from home", "wfh", "work from anywhere"]):
+    return _remote_status_from(_find_keywords(text.lower()))
+
+
+def _remote_status_from(found):
+    """detect_remote_status() from an already computed _find_keywords() set."""
+    if not found.isdisjoint(_REMOTE_STATUS_KEYWORDS):
         return "remote"
-    if "hybrid" in text_lower:
+    if "hybrid" in found:
         return "hybrid"
     return "on-site"
 
 
 def detect_company_type(text):
     """Detect whether a company is a startup or corporate."""
-    text_lower = text.lower()
-    startup_score = sum(1 for kw in STARTUP_KEYWORDS if kw in text_lower)
-    corporate_score = sum(1 for kw in CORPORATE_KEYWORDS if kw in text_lower)
-    if startup_score > corporate_score:
+    return _company_type_from(_find_keywords(text.lower()))
+
+
+def _company_type_from(found):
+    """detect_company_type() from an already computed _find_keywords() set."""
+    # Ties go to corporate
+    if len(found & _STARTUP_SET) > len(found & _CORPORATE_SET):
         return "startup"
-    if corporate_score > startup_score:
-        return "corporate"
     return "corporate"
 
 
 def extract_skills(text, max_skills=8):
     """Extract key skills from job description text."""
+    return _skills_from_lower(text.lower(), max_skills)
+
+
+def _skills_from_lower(text_lower, max_skills=8):
+    """
+    extract_skills() for text that is already lowercased (every skill
+    pattern is case-insensitive).
+    """
+    if _SKILL_AUTOMATON is not None:
+        # One automaton pass finds every literal skill; results still come
+        # out in _SKILL_PATTERNS priority order.
+        matched = _match_skills(text_lower)
+        found = [display for display in _SKILL_ORDER if display in matched]
+        return found[:max_skills] if max_skills else found
+
     found = []
-    for pattern, display in _SKILL_PATTERNS.items():
-        if re.search(pattern, text, re.IGNORECASE) and display not in found:
+    # Skills come out in _SKILL_PATTERNS priority order, so once max_skills
+    # are found the remaining patterns can't change the result.
+    for regex, display in _SKILL_REGEXES:
+        if display not in found and regex.search(text_lower):
             found.append(display)
-    return found[:max_skills] if max_skills else found
+            if max_skills and len(found) >= max_skills:
+                break
+    return found
+
+
+def _normalize_preferences(preferences):
+    """
+    Lowercase and split the preference lists keyword_score() reads. They are
+    the same for every job, so batch callers build this once and pass it in;
+    the result is also memoized on the list contents for one-off callers.
+    Treat it as read-only.
+    """
+    return _normalized_preferences(
+        tuple(preferences.get("job_titles", [])),
+        tuple(preferences.get("locations", [])),
+        tuple(preferences.get("transferable_skills", [])),
+    )
+
+
+@lru_cache(maxsize=8)
+def _normalized_preferences(job_titles, locations, transferable_skills):
+    """_normalize_preferences() on hashable tuples of the preference lists."""
+    user_titles = [t.lower().strip() for t in job_titles]
+    skills_lower = [skill.lower() for skill in transferable_skills]
+    return {
+        "job_titles": user_titles,
+        "title_terms": frozenset(user_titles).union(*(t.split() for t in user_titles)),
+        "title_words": [[w for w in t.split() if len(w) > 2] for t in user_titles],
+        "title_first_words": [t.split()[0] for t in user_titles if t],
+        "locations": [loc.lower().strip() for loc in locations],
+        "transferable_skills": skills_lower,
+        "transferable_terms": frozenset(skills_lower),
+    }
 
 
-def keyword_score(job, preferences):
+def keyword_score(job, preferences, cheap_reject=False, prefs_norm=None):
     """
     Score a job 0-100 using keyword matching.
-    This is the fallback scorer when Ollama is unavailable.
+    This is the fallback scorer when Ollama is unavailable. prefs_norm is
+    _normalize_preferences(preferences), built here when not given.
+
+    With cheap_reject, a job whose role contains no preferred title's first
+    word and whose text has no industry keyword scores 0 immediately
+    instead of being scored on the remaining signals.
 
     Scoring breakdown:
       - Title match:           0-30  (exact match in role title is heavily rewarded)
@@ -304,81 +497,88 @@ def keyword_score(job, preferences):
       - Transferable skills:   0-15  (banking/finance skills mentioned in JD)
       - Penalty:               -20   (irrelevant domain detected)
     """
+    if prefs_norm is None:
+        prefs_norm = _normalize_preferences(preferences)
+    return _keyword_score_lower(job, job.get("role", "").lower(), None, cheap_reject, prefs_norm)
+
+
+def _keyword_score_lower(job, role_lower, description_lower, cheap_reject, prefs_norm):
+    """
+    keyword_score() given the job's lowercased role and, if the caller has
+    it, lowercased description (None to lowercase it here when needed).
+    """
     score = 0
-    role_lower = job.get("role", "").lower()
+
+    # An irrelevant-domain title alone settles it; skip building the full text
+    if not _find_keywords(role_lower).isdisjoint(_IRRELEVANT_SET):
+        return 0
+
+    if description_lower is None:
+        description_lower = job.get("job_description", "").lower()
     text = " ".join([
         role_lower,
-        job.get("company", ""),
-        job.get("job_description", ""),
-        job.get("location", ""),
-        job.get("salary", "") or "",
-    ]).lower()
+        job.get("company", "").lower(),
+        description_lower,
+        job.get("location", "").lower(),
+        (job.get("salary", "") or "").lower(),
+    ])
+
+    found = _find_keywords(text)
 
     # --- Irrelevance penalty: bail early for obviously wrong domains ---
-    for kw in IRRELEVANT_KEYWORDS:
-        if kw in text:
-            return max(0, score - 20)
+    if not found.isdisjoint(_IRRELEVANT_SET):
+        return max(0, score - 20)
 
     # Title match (0-30) — strongest signal
-    user_titles = [t.lower().strip() for t in preferences.get("job_titles", [])]
+    role_terms = _find_terms(role_lower, prefs_norm["title_terms"])
     best_title_score = 0
-    for title in user_titles:
-        if title in role_lower:
+    for title, title_words in zip(prefs_norm["job_titles"], prefs_norm["title_words"]):
+        if title in role_terms:
             # Exact phrase match in role title
             best_title_score = max(best_title_score, 30)
-        else:
+        elif title_words:
             # Partial: check how many words from the preferred title appear in the role
-            title_words = [w for w in title.split() if len(w) > 2]
-            if title_words:
-                matches = sum(1 for w in title_words if w in role_lower)
-                ratio = matches / len(title_words)
-                if ratio >= 0.8:
-                    best_title_score = max(best_title_score, 22)
-                elif ratio >= 0.5:
-                    best_title_score = max(best_title_score, 12)
+            matches = sum(1 for w in title_words if w in role_terms)
+            ratio = matches / len(title_words)
+            if ratio >= 0.8:
+                best_title_score = max(best_title_score, 22)
+            elif ratio >= 0.5:
+                best_title_score = max(best_title_score, 12)
     score += best_title_score
 
+    if cheap_reject and not best_title_score and found.isdisjoint(FINTECH_KEYWORDS):
+        if not any(w in role_terms for w in prefs_norm["title_first_words"]):
+            return 0
+
     # Location match (0-10)
-    user_locations = [loc.lower().strip() for loc in preferences.get("locations", [])]
     job_loc = job.get("location", "").lower()
-    for loc in user_locations:
+    for loc in prefs_norm["locations"]:
         if loc in job_loc or job_loc in loc:
             score += 10
             break
 
     # Remote work bonus (0-10)
     for kw, pts in REMOTE_KEYWORDS.items():
-        if kw in text:
+        if kw in found:
             score += pts
             break
 
-    # Industry/domain relevance (0-20) — accumulate multiple matches
-    industry_score = 0
-    for kw, pts in FINTECH_KEYWORDS.items():
-        if kw in text:
-            industry_score += pts
-    score += min(industry_score, 20)
-
-    # PM keywords in description/title (0-20) — accumulate
-    pm_score = 0
-    for kw, pts in PM_KEYWORDS.items():
-        if kw in text:
-            pm_score += pts
-    score += min(pm_score, 20)
-
-    # Career growth (0-10)
-    growth_score = 0
-    for kw, pts in GROWTH_KEYWORDS.items():
-        if kw in text:
-            growth_score += pts
-    score += min(growth_score, 10)
+    # Industry/domain (0-20), PM keywords (0-20) and career growth (0-10):
+    # accumulate every matched keyword, then cap each bucket
+    bucket_scores = dict.fromkeys(_SCORE_BUCKETS, 0)
+    for kw in found:
+        for bucket, pts in _KEYWORD_WEIGHTS.get(kw, ()):
+            bucket_scores[bucket] += pts
+    for bucket, (_, cap) in _SCORE_BUCKETS.items():
+        score += min(bucket_scores[bucket], cap)
 
     # Transferable skills from banking/finance (0-15)
-    transferable = preferences.get("transferable_skills", [])
-    if transferable:
+    skills_lower = prefs_norm["transferable_skills"]
+    if skills_lower:
+        skills_found = _find_terms(text, prefs_norm["transferable_terms"])
         ts_score = 0
-        for skill in transferable:
-            if skill.lower() in text:
+        for skill in skills_lower:
+            if skill in skills_found:
                 ts_score += 5
         score += min(ts_score, 15)
 
@@ -389,62 +589,281 @@ def keyword_score(job, preferences):
 # Ollama-based scoring
 # =============================================================================
 
-def ollama_score(job, preferences, config):
+# Persistent cache of Ollama score results, so reposted/unchanged jobs don't
+# pay for another model call on the next run.
+_DATA_DIR = "/tmp" if os.environ.get("VERCEL") else os.environ.get(
+    "DATA_DIR", os.path.dirname(os.path.abspath(__file__))
+)
+SCORE_CACHE_PATH = os.path.join(_DATA_DIR, "score_cache.db")
+# Entries older than this are ignored and overwritten, so a model or server
+# update eventually refreshes long-lived postings.
+SCORE_CACHE_MAX_AGE = timedelta(days=7)
+
+
+def _score_cache_key(model, prompt):
+    """Key on model + full prompt, so any job, preference or prompt change misses."""
+    return hashlib.blake2b(f"{model}\n{prompt}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+_score_cache_conns = threading.local()
+
+
+def _score_cache_connection():
     """
-    Use Ollama (mistral) to score a job and generate analysis.
-    Returns (score, analysis_text) or None if Ollama fails.
+    This thread's long-lived score cache connection, like
+    database.get_thread_connection(). The table is created once per
+    connection, not on every lookup.
     """
+    key = (os.getpid(), SCORE_CACHE_PATH)
+    if getattr(_score_cache_conns, "key", None) != key:
+        # First use on this thread, or after a fork or a path change
+        conn = sqlite3.connect(SCORE_CACHE_PATH, timeout=10)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ollama_scores ("
+            "cache_key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at TEXT NOT NULL)"
+        )
+        _score_cache_conns.conn = conn
+        _score_cache_conns.key = key
+    return _score_cache_conns.conn
+
+
+def _get_cached_score(cache_key):
+    """Return the cached Ollama result (score or tailored points) for cache_key, or None."""
     try:
-        import ollama as ollama_client
-    except ImportError:
-        logger.warning("ollama package not installed, falling back to keyword scoring")
+        cutoff = (_datetime.now() - SCORE_CACHE_MAX_AGE).isoformat()
+        row = _score_cache_connection().execute(
+            "SELECT result FROM ollama_scores WHERE cache_key = ? AND created_at >= ?",
+            (cache_key, cutoff),
+        ).fetchone()
+        return _json_loads(row[0]) if row else None
+    except (sqlite3.Error, ValueError) as e:
+        # A corrupt row is just a miss; the next store overwrites it
+        logger.debug("Score cache read failed: %s", e)
         return None
 
-    model = config.get("scoring", {}).get("ollama_model", "mistral")
-    timeout = config.get("scoring", {}).get("ollama_timeout", 60)
 
-    transferable = preferences.get("transferable_skills", [])
-    transferable_text = f"\n- Transferable skills from banking: {', '.join(transferable)}" if transferable else ""
+def _set_cached_score(cache_key, result):
+    """Store an Ollama result. Cache failures never break scoring."""
+    try:
+        conn = _score_cache_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ollama_scores (cache_key, result, created_at) VALUES (?, ?, ?)",
+                (cache_key, json.dumps(result), _datetime.now().isoformat()),
+            )
+    except sqlite3.Error as e:
+        logger.debug("Score cache write failed: %s", e)
+
+
+# How long the server keeps the model loaded after each request, so a scoring
+# run does not pay the model load again between jobs.
+_OLLAMA_KEEP_ALIVE = "30m"
+
+# Score replies are one small JSON object. JSON mode keeps the model from
+# wrapping it in prose, and num_predict stops generation from running on
+# (a batch gets this many tokens per job). top_k=1 decodes greedily, and a
+# 2048-token context comfortably fits the single-job prompt.
+_OLLAMA_SCORE_NUM_PREDICT = 128
+_OLLAMA_SCORE_OPTIONS = {
+    "temperature": 0.1,
+    "top_k": 1,
+    "num_predict": _OLLAMA_SCORE_NUM_PREDICT,
+    "num_ctx": 2048,
+}
 
-    prompt = f"""Analyze this job posting and score it 0-100 for a candidate with the following profile:
-- Career transitioner from banking/financial services to Product Management
-- Looking for roles: {', '.join(preferences.get('job_titles', ['Product Manager']))}
-- Preferred locations: {', '.join(preferences.get('locations', ['Remote']))}
-- Industries of interest: {', '.join(preferences.get('industries', ['Fintech']))}{transferable_text}
+# Checked once, like _HAVE_OPENAI: lru_cache does not remember the
+# ImportError, so without this every call would retry the failed import.
+_HAVE_OLLAMA = importlib.util.find_spec("ollama") is not None
 
-Job Details:
-- Title: {job.get('role', 'Unknown')}
-- Company: {job.get('company', 'Unknown')}
-- Location: {job.get('location', 'Unknown')}
-- Salary: {job.get('salary', 'Not specified')}
-- Description: {job.get('job_description', 'No description available')[:500]}
 
-Score based on:
+@lru_cache(maxsize=4)
+def _ollama_client(timeout=None):
+    """
+    Shared Ollama client (one per timeout) so every call reuses the same
+    pooled HTTP connection. The host comes from OLLAMA_HOST as with the
+    module-level ollama functions. Raises ImportError if ollama is missing.
+    """
+    if not _HAVE_OLLAMA:
+        raise ImportError("ollama package not installed")
+    import ollama
+    return ollama.Client(timeout=timeout)
+
+
+# How long a model-list lookup is trusted, keyed by (OLLAMA_HOST, model), so
+# every scheduler run does not ask the server which models it has.
+_MODEL_CHECK_TTL = 300
+_model_check_cache = {}
+_model_check_lock = threading.Lock()
+
+
+def _ollama_model_available(ollama_client, model):
+    """
+    Return True if the Ollama server lists model. A successful answer is
+    remembered for _MODEL_CHECK_TTL seconds; while it is fresh a failing
+    list() call does not turn AI scoring off. Raises if the server cannot be
+    reached and nothing is cached.
+    """
+    key = (os.environ.get("OLLAMA_HOST", ""), model)
+    now = time.monotonic()
+    with _model_check_lock:
+        cached = _model_check_cache.get(key)
+    if cached and now - cached[0] < _MODEL_CHECK_TTL:
+        return cached[1]
+
+    try:
+        models = ollama_client.list()
+    except Exception:
+        if cached and cached[1]:
+            logger.debug("Ollama model list failed, using the last successful check")
+            return True
+        raise
+    model_names = [m.model.split(":")[0] for m in models.models] if hasattr(models, "models") else []
+    available = model in model_names
+    if not available:
+        logger.warning(
+            "Ollama is running but model '%s' not found (available: %s). "
+            "Using keyword-based scoring. Run 'ollama pull %s' to enable AI scoring.",
+            model, model_names, model,
+        )
+    with _model_check_lock:
+        _model_check_cache[key] = (now, available)
+    return available
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _extract_json(content, opener="{"):
+    """
+    Return the first JSON value starting with opener ("{" or "[") embedded
+    in an LLM response, or None. Unlike a regex match this copes with nested
+    braces inside string values.
+    """
+    # Fast path: the whole response is the JSON value
+    if content.startswith(opener):
+        try:
+            return _json_loads(content)
+        except ValueError:
+            pass
+    idx = content.find(opener)
+    while idx >= 0:
+        try:
+            return _JSON_DECODER.raw_decode(content, idx)[0]
+        except ValueError:
+            idx = content.find(opener, idx + 1)
+    return None
+
+
+def _validated_score(result):
+    """
+    Check a parsed score reply: a dict whose "score" converts to int. Returns
+    it with the score clamped to 0-100, or None so the job falls back to
+    keyword scoring instead of failing later on a bad value.
+    """
+    if not isinstance(result, dict):
+        return None
+    try:
+        score = int(result["score"])
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return None
+    result["score"] = min(max(score, 0), 100)
+    return result
+
+
+def _ollama_profile_text(preferences):
+    """Candidate profile lines shared by the single and batched score prompts."""
+    return _ollama_profile_text_cached(
+        tuple(preferences.get("job_titles", ["Product Manager"])),
+        tuple(preferences.get("locations", ["Remote"])),
+        tuple(preferences.get("industries", ["Fintech"])),
+        tuple(preferences.get("transferable_skills", [])),
+    )
+
+
+@lru_cache(maxsize=16)
+def _ollama_profile_text_cached(job_titles, locations, industries, transferable):
+    """Built once per distinct preferences instead of once per scored job."""
+    transferable_text = f"\n- Transferable skills from banking: {', '.join(transferable)}" if transferable else ""
+    return f"""- Career transitioner from banking/financial services to Product Management
+- Looking for roles: {', '.join(job_titles)}
+- Preferred locations: {', '.join(locations)}
+- Industries of interest: {', '.join(industries)}{transferable_text}"""
+
+
+_OLLAMA_SCORE_CRITERIA = """Score based on:
 1. Role match with preferred titles (0-25 points)
 2. Location match (0-15 points)
 3. Remote/hybrid flexibility (0-15 points)
 4. Domain relevance - banking/fintech background advantage (0-15 points)
 5. Career growth potential for PM transition (0-15 points)
-6. Company type suitability - startup vs corporate (0-15 points)
+6. Company type suitability - startup vs corporate (0-15 points)"""
+
+_OLLAMA_SCORE_PROMPT = """Analyze this job posting and score it 0-100 for a candidate with the following profile:
+{profile}
+
+Job Details:
+- Title: {role}
+- Company: {company}
+- Location: {location}
+- Salary: {salary}
+- Description: {description}
+
+""" + _OLLAMA_SCORE_CRITERIA + """
 
 Respond ONLY with valid JSON in this exact format:
 {{"score": <number 0-100>, "remote_status": "<remote|hybrid|on-site>", "company_type": "<startup|corporate>", "reason": "<one sentence explanation>"}}"""
 
+
+def _ollama_score_prompt(job, preferences):
+    """Single-job scoring prompt; also the cache key for that job's score."""
+    return _OLLAMA_SCORE_PROMPT.format(
+        profile=_ollama_profile_text(preferences),
+        role=job.get("role", "Unknown"),
+        company=job.get("company", "Unknown"),
+        location=job.get("location", "Unknown"),
+        salary=job.get("salary", "Not specified"),
+        description=job.get("job_description", "No description available")[:500],
+    )
+
+
+def ollama_score(job, preferences, config):
+    """
+    Use Ollama (mistral) to score a job and generate analysis.
+    Returns (score, analysis_text) or None if Ollama fails.
+    """
+    model = config.get("scoring", {}).get("ollama_model", "mistral")
+    timeout = config.get("scoring", {}).get("ollama_timeout", 60)
+
+    try:
+        ollama_client = _ollama_client(timeout)
+    except ImportError:
+        logger.warning("ollama package not installed, falling back to keyword scoring")
+        return None
+
+    prompt = _ollama_score_prompt(job, preferences)
+
+    cache_key = _score_cache_key(model, prompt)
+    cached = _get_cached_score(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         response = ollama_client.chat(
             model=model,
             messages=[{"role": "user", "content": prompt}],
-            options={"temperature": 0.1},
+            format="json",
+            options=_OLLAMA_SCORE_OPTIONS,
+            keep_alive=_OLLAMA_KEEP_ALIVE,
         )
         content = response["message"]["content"].strip()
 
         # Extract JSON from response
-        json_match = re.search(r'\{[^}]+\}', content)
-        if json_match:
-            result = json.loads(json_match.group())
+        result = _validated_score(_extract_json(content))
+        if result is not None:
+            _set_cached_score(cache_key, result)
             return result
         else:
-            logger.warning("Ollama returned non-JSON response: %s", content[:200])
+            logger.warning("Ollama returned no usable score JSON: %s", content[:200])
             return None
     except ConnectionError:
         logger.warning("Ollama not running. Falling back to keyword scoring.")
@@ -454,32 +873,121 @@ Respond ONLY with valid JSON in this exact format:
         return None
 
 
+def ollama_score_batch(jobs, preferences, config):
+    """
+    Score several jobs with one Ollama request, sharing the prompt and
+    round-trip cost between them. Returns one ollama_score()-style result
+    per job, in order, with None for jobs the model did not score. Results
+    share the persistent cache with ollama_score().
+    """
+    model = config.get("scoring", {}).get("ollama_model", "mistral")
+    timeout = config.get("scoring", {}).get("ollama_timeout", 60)
+
+    try:
+        ollama_client = _ollama_client(timeout)
+    except ImportError:
+        logger.warning("ollama package not installed, falling back to keyword scoring")
+        return [None] * len(jobs)
+
+    cache_keys = [_score_cache_key(model, _ollama_score_prompt(job, preferences)) for job in jobs]
+    results = [_get_cached_score(key) for key in cache_keys]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+
+    job_lines = "\n".join(
+        f"[{n}] Title: {jobs[i].get('role', 'Unknown')} | "
+        f"Company: {jobs[i].get('company', 'Unknown')} | "
+        f"Location: {jobs[i].get('location', 'Unknown')} | "
+        f"Salary: {jobs[i].get('salary', 'Not specified')} | "
+        f"Description: {jobs[i].get('job_description', 'No description available')[:300]}"
+        for n, i in enumerate(pending, 1)
+    )
+    prompt = f"""Analyze these {len(pending)} job postings and score each 0-100 for a candidate with the following profile:
+{_ollama_profile_text(preferences)}
+
+Jobs:
+{job_lines}
+
+{_OLLAMA_SCORE_CRITERIA}
+
+Respond ONLY with valid JSON in this exact format, one entry per job:
+{{"results": [{{"id": <job number>, "score": <number 0-100>, "remote_status": "<remote|hybrid|on-site>", "company_type": "<startup|corporate>", "reason": "<one sentence explanation>"}}, ...]}}"""
+
+    try:
+        response = ollama_client.chat(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            format="json",
+            # Batch prompts can outgrow the single-job num_ctx, so keep the
+            # model default there
+            options={
+                "temperature": 0.1,
+                "top_k": 1,
+                "num_predict": _OLLAMA_SCORE_NUM_PREDICT * len(pending),
+            },
+            keep_alive=_OLLAMA_KEEP_ALIVE,
+        )
+        content = response["message"]["content"].strip()
+    except ConnectionError:
+        logger.warning("Ollama not running. Falling back to keyword scoring.")
+        return results
+    except Exception as e:
+        logger.warning("Ollama batch scoring failed: %s. Falling back to keyword scoring.", e)
+        return results
+
+    parsed = _extract_json(content)
+    entries = parsed.get("results") if isinstance(parsed, dict) else None
+    if not isinstance(entries, list):
+        logger.warning("Ollama returned non-JSON batch response: %s", content[:200])
+        return results
+
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            n = int(entry.pop("id"))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 1 <= n <= len(pending) and _validated_score(entry) is not None:
+            i = pending[n - 1]
+            results[i] = entry
+            _set_cached_score(cache_keys[i], entry)
+    return results
+
+
 # =============================================================================
 # Main analysis pipeline
 # =============================================================================
 
-def generate_application_email(job, preferences):
-    """Generate a short personalized application email draft."""
+_APPLICATION_EMAIL_TEMPLATE = (
+    "Dear Hiring Team at {company},\n\n"
+    "I am writing to express my interest in the {role} position. "
+    "With my background in banking and financial services, I bring a strong foundation in "
+    "analytical thinking, stakeholder management, and customer-centric problem solving. "
+    "My experience with {skills_text} aligns well with this role's requirements. "
+    "I am excited about the opportunity to leverage my domain expertise "
+    "to drive product impact at {company}.\n\n"
+    "I would welcome the chance to discuss how my skills can contribute to your team.\n\n"
+    "Best regards"
+)
+
+
+def generate_application_email(job, preferences, skills=None):
+    """
+    Generate a short personalized application email draft. skills is the
+    job's extract_skills() result when the caller already has it; only the
+    first three are mentioned.
+    """
     role = job.get("role", "the role")
     company = job.get("company", "your company")
-    description = job.get("job_description", "")
 
     # Extract a few skills from the description
-    skills = extract_skills(description, max_skills=3)
-    skills_text = ", ".join(skills) if skills else "product strategy and data-driven decision making"
-
-    email = (
-        f"Dear Hiring Team at {company},\n\n"
-        f"I am writing to express my interest in the {role} position. "
-        f"With my background in banking and financial services, I bring a strong foundation in "
-        f"analytical thinking, stakeholder management, and customer-centric problem solving. "
-        f"My experience with {skills_text} aligns well with this role's requirements. "
-        f"I am excited about the opportunity to leverage my domain expertise "
-        f"to drive product impact at {company}.\n\n"
-        f"I would welcome the chance to discuss how my skills can contribute to your team.\n\n"
-        f"Best regards"
-    )
-    return email
+    if skills is None:
+        skills = extract_skills(job.get("job_description", ""), max_skills=3)
+    skills_text = ", ".join(skills[:3]) if skills else "product strategy and data-driven decision making"
+
+    return _APPLICATION_EMAIL_TEMPLATE.format(company=company, role=role, skills_text=skills_text)
 
 
 def generate_tailored_points(job, preferences, config):
@@ -497,7 +1005,7 @@ def generate_tailored_points(job, preferences, config):
     use_ollama = config.get("scoring", {}).get("use_ollama", True)
     if use_ollama:
         try:
-            import ollama as ollama_client
+            ollama_client = _ollama_client(config.get("scoring", {}).get("ollama_timeout", 60))
             model = config.get("scoring", {}).get("ollama_model", "mistral")
 
             prompt = f"""Generate 4-5 tailored resume bullet points for a banking professional applying to this role.
@@ -515,18 +1023,25 @@ Write bullet points that:
 
 Respond with ONLY a JSON array of strings, like: ["point 1", "point 2", ...]"""
 
+            # Same job + preferences give the same prompt; reopening a job's
+            # panel shouldn't wait on the model again
+            cache_key = _score_cache_key(model, prompt)
+            cached = _get_cached_score(cache_key)
+            if isinstance(cached, list) and cached:
+                return cached
+
             response = ollama_client.chat(
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
                 options={"temperature": 0.3},
+                keep_alive=_OLLAMA_KEEP_ALIVE,
             )
             content = response["message"]["content"].strip()
             # Extract JSON array
-            json_match = re.search(r'\[.*\]', content, re.DOTALL)
-            if json_match:
-                points = json.loads(json_match.group())
-                if isinstance(points, list) and len(points) > 0:
-                    return points
+            points = _extract_json(content, "[")
+            if isinstance(points, list) and len(points) > 0:
+                _set_cached_score(cache_key, points)
+                return points
         except Exception:
             pass  # Fall through to keyword-based
 
@@ -556,95 +1071,236 @@ Respond with ONLY a JSON array of strings, like: ["point 1", "point 2", ...]"""
     return points[:5]
 
 
-def analyze_jobs(jobs, preferences, config, progress_callback=None):
+def _analyze_job(job, preferences, ollama_result=None, cheap_reject=False, prefs_norm=None):
     """
-    Analyze and score all jobs. Uses Ollama if available, falls back to keywords.
-    Returns list of jobs enriched with relevance_score, remote_status,
-    company_type, skills, and application_email.
+    Enrich a single job in place. ollama_result is the ollama_score() output
+    for this job, or None to score with keywords (see keyword_score for
+    cheap_reject and prefs_norm).
+    """
+    # Read and lowercase each field once; the extractors below share these
+    # strings and a single keyword pass over the detector text.
+    description_lower = job.get("job_description", "").lower()
+    role_lower = job.get("role", "").lower()
+    role_and_description = " ".join([role_lower, description_lower])
+
+    # Use the Ollama result when there is one, fall back to keywords. The
+    # keyword pass only runs when something actually needs it.
+    if ollama_result:
+        job["relevance_score"] = min(max(int(ollama_result.get("score", 0)), 0), 100)
+        if "remote_status" in ollama_result and "company_type" in ollama_result:
+            job["remote_status"] = ollama_result["remote_status"]
+            job["company_type"] = ollama_result["company_type"]
+        else:
+            found = _find_keywords(" ".join([role_and_description, job.get("location", "").lower()]))
+            job["remote_status"] = ollama_result.get("remote_status", _remote_status_from(found))
+            job["company_type"] = ollama_result.get("company_type", _company_type_from(found))
+    else:
+        # Ollama unavailable or failed for this job, use keywords
+        found = _find_keywords(" ".join([role_and_description, job.get("location", "").lower()]))
+        if prefs_norm is None:
+            prefs_norm = _normalize_preferences(preferences)
+        job["relevance_score"] = _keyword_score_lower(
+            job, role_lower, description_lower, cheap_reject, prefs_norm
+        )
+        job["remote_status"] = _remote_status_from(found)
+        job["company_type"] = _company_type_from(found)
+
+    # Extract skills and generate email for all jobs
+    job["skills"] = _skills_from_lower(description_lower)
+    job["application_email"] = generate_application_email(job, preferences, job["skills"])
+
+    # Extract experience range
+    exp_min, exp_max = _experience_years_lower(role_and_description)
+    job["experience_min"] = exp_min
+    job["experience_max"] = exp_max
+
+    # Parse salary to annual INR
+    salary_min, salary_max = parse_salary_to_annual_inr(
+        job.get("salary", ""), job.get("salary_currency")
+    )
+    job["salary_min"] = salary_min
+    job["salary_max"] = salary_max
+
+    # Extract company info from JD
+    company_info = _company_info_lower(description_lower) if description_lower else {}
+    job["company_size"] = company_info.get("company_size")
+    job["company_funding_stage"] = company_info.get("company_funding_stage")
+    job["company_glassdoor_rating"] = company_info.get("company_glassdoor_rating")
+
+
+# Keyword-only batches larger than this may be spread over worker processes
+# (scoring.keyword_processes). Spawning two workers costs ~0.5 s against
+# 0.15-0.7 ms of keyword work per job, so the pool only breaks even past a
+# thousand or so jobs; below this the serial loop is faster.
+_PARALLEL_KEYWORD_MIN_JOBS = 5000
+
+
+def _analyze_job_in_worker(job, preferences, cheap_reject, prefs_norm):
+    """Process-pool entry point: the analyzed job goes back as a copy."""
+    _analyze_job(job, preferences, None, cheap_reject, prefs_norm)
+    return job
+
+
+def _keyword_pool_results(jobs, preferences, config, cheap_reject, prefs_norm):
+    """
+    Start keyword analysis of jobs in a process pool and return
+    (executor, in-order result iterator), or (None, None) unless
+    scoring.keyword_processes asks for more than one worker, the batch is
+    large enough, and processes can be started here.
+    """
+    workers = min(
+        int(config.get("scoring", {}).get("keyword_processes", 0) or 0),
+        os.cpu_count() or 1,
+    )
+    if workers < 2 or len(jobs) <= _PARALLEL_KEYWORD_MIN_JOBS:
+        return None, None
+    try:
+        # spawn, not fork: analyze_jobs runs in Flask background threads and
+        # forking a threaded process can deadlock on inherited locks
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        worker = partial(
+            _analyze_job_in_worker,
+            preferences=preferences, cheap_reject=cheap_reject, prefs_norm=prefs_norm,
+        )
+        results = executor.map(worker, jobs, chunksize=max(1, len(jobs) // (4 * workers)))
+    except (OSError, NotImplementedError) as e:
+        logger.warning("Process pool unavailable (%s), scoring keywords serially", e)
+        return None, None
+    return executor, results
+
+
+def iter_analyzed_jobs(jobs, preferences, config, progress_callback=None):
+    """
+    Analyze and score jobs one at a time, in input order. Uses Ollama if
+    available, falls back to keywords. Each job is enriched in place and
+    yielded as soon as it is done, so callers that write results out as they
+    go never hold a second list of every job.
     """
     use_ollama = config.get("scoring", {}).get("use_ollama", True)
-    min_score = config.get("scoring", {}).get("min_relevance_score", 65)
+    cheap_reject = config.get("scoring", {}).get("cheap_reject", False)
     ollama_available = False
 
     if use_ollama:
         try:
-            import ollama as ollama_client
+            ollama_client = _ollama_client(config.get("scoring", {}).get("ollama_timeout", 60))
             # Check that both Ollama is running AND the model exists
             model = config.get("scoring", {}).get("ollama_model", "mistral")
-            models = ollama_client.list()
-            model_names = [m.model.split(":")[0] for m in models.models] if hasattr(models, "models") else []
-            if model in model_names:
+            if _ollama_model_available(ollama_client, model):
                 ollama_available = True
                 logger.info("Ollama is available with model '%s', using AI-based scoring", model)
-            else:
-                logger.warning(
-                    "Ollama is running but model '%s' not found (available: %s). "
-                    "Using keyword-based scoring. Run 'ollama pull %s' to enable AI scoring.",
-                    model, model_names, model,
-                )
+                # Load the model once up front so the first scored job does
+                # not absorb the load time
+                if jobs:
+                    try:
+                        ollama_client.chat(
+                            model=model,
+                            messages=[{"role": "user", "content": "ping"}],
+                            options={"num_predict": 1},
+                            keep_alive=_OLLAMA_KEEP_ALIVE,
+                        )
+                    except Exception as e:
+                        logger.debug("Ollama warm-up failed: %s", e)
         except Exception:
             logger.warning("Ollama is not available, using keyword-based scoring fallback")
 
-    analyzed = []
     total = len(jobs)
-
-    for i, job in enumerate(jobs):
-        text = " ".join([
-            job.get("role", ""),
-            job.get("job_description", ""),
-            job.get("location", ""),
-        ])
-
-        # Try Ollama first, fall back to keywords
-        if ollama_available:
-            result = ollama_score(job, preferences, config)
-            if result:
-                job["relevance_score"] = min(max(int(result.get("score", 0)), 0), 100)
-                job["remote_status"] = result.get("remote_status", detect_remote_status(text))
-                job["company_type"] = result.get("company_type", detect_company_type(text))
-            else:
-                # Ollama failed for this job, use keywords
-                job["relevance_score"] = keyword_score(job, preferences)
-                job["remote_status"] = detect_remote_status(text)
-                job["company_type"] = detect_company_type(text)
+    prefs_norm = _normalize_preferences(preferences)
+
+    # Ollama calls are I/O-bound on our side, so submit them all up front and
+    # let a small pool overlap the requests. The server only runs them in
+    # parallel when started with OLLAMA_NUM_PARALLEL >= ollama_concurrency.
+    # With scoring.ollama_batch_size > 1 each request scores that many jobs.
+    # With scoring.llm_uncertainty_band = [low, high] only jobs whose keyword
+    # score falls inside the band go to Ollama; the rest keep keyword scores.
+    executor = None
+    ollama_pending = {}  # job index -> (future, position in batch result or None)
+    keyword_results = None
+    if ollama_available:
+        concurrency = config.get("scoring", {}).get("ollama_concurrency", 4)
+        batch_size = max(1, int(config.get("scoring", {}).get("ollama_batch_size", 1)))
+        band = config.get("scoring", {}).get("llm_uncertainty_band")
+        if band:
+            low, high = band
+            llm_indices = [
+                i for i, job in enumerate(jobs)
+                if low <= keyword_score(job, preferences, cheap_reject, prefs_norm) <= high
+            ]
+            logger.info(
+                "%d/%d jobs fall in the keyword score band %s-%s and go to Ollama",
+                len(llm_indices), total, low, high,
+            )
+        else:
+            llm_indices = range(total)
+        executor = ThreadPoolExecutor(max_workers=max(1, int(concurrency)))
+        if batch_size > 1:
+            for start in range(0, len(llm_indices), batch_size):
+                chunk = llm_indices[start:start + batch_size]
+                future = executor.submit(
+                    ollama_score_batch, [jobs[i] for i in chunk], preferences, config
+                )
+                for pos, i in enumerate(chunk):
+                    ollama_pending[i] = (future, pos)
         else:
-            job["relevance_score"] = keyword_score(job, preferences)
-            job["remote_status"] = detect_remote_status(text)
-            job["company_type"] = detect_company_type(text)
-
-        # Extract skills and generate email for all jobs
-        job["skills"] = extract_skills(job.get("job_description", ""))
-        job["application_email"] = generate_application_email(job, preferences)
-
-        # Extract experience range
-        exp_text = " ".join([job.get("role", ""), job.get("job_description", "")])
-        exp_min, exp_max = extract_experience_years(exp_text)
-        job["experience_min"] = exp_min
-        job["experience_max"] = exp_max
-
-        # Parse salary to annual INR
-        salary_min, salary_max = parse_salary_to_annual_inr(
-            job.get("salary", ""), job.get("salary_currency")
+            for i in llm_indices:
+                ollama_pending[i] = (executor.submit(ollama_score, jobs[i], preferences, config), None)
+    else:
+        # Keyword scoring is CPU-bound, so large batches use processes instead
+        executor, keyword_results = _keyword_pool_results(
+            jobs, preferences, config, cheap_reject, prefs_norm
         )
-        job["salary_min"] = salary_min
-        job["salary_max"] = salary_max
 
-        # Extract company info from JD
-        company_info = extract_company_info(job.get("job_description", ""))
-        job["company_size"] = company_info.get("company_size")
-        job["company_funding_stage"] = company_info.get("company_funding_stage")
-        job["company_glassdoor_rating"] = company_info.get("company_glassdoor_rating")
+    try:
+        for i, job in enumerate(jobs):
+            if keyword_results is not None:
+                try:
+                    job.update(next(keyword_results))
+                except BrokenProcessPool as e:
+                    logger.warning(
+                        "Keyword process pool died at job %d/%d (%s), scoring the rest serially",
+                        i + 1, total, e,
+                    )
+                    keyword_results = None
+            if keyword_results is None:
+                ollama_result = None
+                if i in ollama_pending:
+                    future, pos = ollama_pending[i]
+                    ollama_result = future.result() if pos is None else future.result()[pos]
+                _analyze_job(job, preferences, ollama_result, cheap_reject, prefs_norm)
+
+            if progress_callback:
+                progress_callback(i + 1, total, job.get("role", ""), job["relevance_score"])
+            yield job
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        analyzed.append(job)
 
-        if progress_callback:
-            progress_callback(i + 1, total, job.get("role", ""), job["relevance_score"])
+def analyze_jobs(jobs, preferences, config, progress_callback=None):
+    """
+    Analyze and score all jobs. Uses Ollama if available, falls back to keywords.
+    Returns (qualified, analyzed): every job enriched with relevance_score,
+    remote_status, company_type, skills, and application_email, plus those
+    scoring at least scoring.min_relevance_score, best first. When
+    scoring.top_k is set only that many qualified jobs are kept.
+    """
+    min_score = config.get("scoring", {}).get("min_relevance_score", 65)
+    top_k = config.get("scoring", {}).get("top_k")
+    total = len(jobs)
+
+    analyzed = list(iter_analyzed_jobs(jobs, preferences, config, progress_callback))
 
     # Filter by minimum score
     qualified = [j for j in analyzed if j["relevance_score"] >= min_score]
 
-    # Sort by relevance score descending
-    qualified.sort(key=lambda x: x["relevance_score"], reverse=True)
+    # Sort by relevance score descending; a partial selection is enough
+    # when only the top few are wanted. itemgetter keeps the key lookup in C.
+    by_score = itemgetter("relevance_score")
+    if top_k:
+        qualified = heapq.nlargest(int(top_k), qualified, key=by_score)
+    else:
+        qualified.sort(key=by_score, reverse=True)
 
     logger.info(
         "Analysis complete: %d/%d jobs passed minimum score of %d",
@@ -680,63 +1336,101 @@ _NLP_CITY_TRIGGERS = {
     "Remote": ["remote"],
 }
 
+# Patterns used by _regex_parse_nlp_query(), compiled once at import
+_NLP_REMOTE_RE = re.compile(r'\b(remote|wfh|work\s*from\s*home)\b')
+_NLP_HYBRID_RE = re.compile(r'\bhybrid\b')
+_NLP_ONSITE_RE = re.compile(r'\b(on[\s-]?site|office)\b')
+# (group name, canonical, trigger patterns) in _NLP_CITY_TRIGGERS order
+_NLP_CITY_RES = [
+    (f"c{i}", canonical, [re.compile(r'\b' + re.escape(t) + r'\b') for t in triggers])
+    for i, (canonical, triggers) in enumerate(_NLP_CITY_TRIGGERS.items())
+]
+# One pass over the query that names (by group) every city it mentions
+_NLP_CITY_ANY_RE = re.compile(
+    r'\b(?:' + '|'.join(
+        f'(?P<{group}>' + '|'.join(re.escape(t) for t in _NLP_CITY_TRIGGERS[canonical]) + ')'
+        for group, canonical, _ in _NLP_CITY_RES
+    ) + r')\b'
+)
+# (pattern, filter value) rules tried in order; the first that matches wins
+_NLP_REMOTE_RULES = (
+    (_NLP_REMOTE_RE, "remote"),
+    (_NLP_HYBRID_RE, "hybrid"),
+    (_NLP_ONSITE_RE, "on-site"),
+)
+_NLP_SALARY_MIN_RE = re.compile(
+    r'\b(?:above|over|more\s*than|minimum|min|>=?)\s*(\d+)\s*(?:lakhs?|lpa|l|lakh)\b'
+)
+_NLP_SALARY_MAX_RE = re.compile(
+    r'\b(?:below|under|less\s*than|maximum|max|<=?)\s*(\d+)\s*(?:lakhs?|lpa|l|lakh)\b'
+)
+_NLP_SALARY_RANGE_RE = re.compile(r'\b(\d+)\s*(?:-|–|to)\s*(\d+)\s*(?:lakhs?|lpa|l|lakh)\b')
+_NLP_EXP_RANGE_RE = re.compile(r'\b(\d+)\s*(?:-|–|to)\s*(\d+)\s*(?:years?|yrs?)\b')
+_NLP_EXP_PLUS_RE = re.compile(r'\b(\d+)\+?\s*(?:years?|yrs?)\b')
+_NLP_JUNIOR_RE = re.compile(r'\b(entry[\s-]?level|fresher|junior)\b')
+_NLP_SENIOR_RE = re.compile(r'\b(senior|lead|principal|staff)\b')
+_NLP_STARTUP_RE = re.compile(r'\bstartup\b')
+_NLP_CORPORATE_RE = re.compile(r'\b(corporate|mnc|enterprise)\b')
+_NLP_NEWEST_RE = re.compile(r'\b(newest|latest|recent)\b')
+_NLP_BEST_MATCH_RE = re.compile(r'\b(highest\s*score|best\s*match)\b')
+_NLP_SENIORITY_RULES = ((_NLP_JUNIOR_RE, "0-3"), (_NLP_SENIOR_RE, "7-12"))
+_NLP_COMPANY_TYPE_RULES = ((_NLP_STARTUP_RE, "startup"), (_NLP_CORPORATE_RE, "corporate"))
+_NLP_SORT_RULES = ((_NLP_NEWEST_RE, "date_desc"), (_NLP_BEST_MATCH_RE, "score_desc"))
+# "new" marks the query as unapplied but stays in the search text
+_NLP_UNAPPLIED_RE = re.compile(r"\b(haven'?t applied|not applied|unapplied|new)\b")
+_NLP_UNAPPLIED_PHRASE_RE = re.compile(r"\b(haven'?t applied|not applied|unapplied)\b")
+_NLP_FILLER_RE = re.compile(
+    r'\b(show|me|find|get|search|for|in|with|at|the|a|an|and|or|jobs?|roles?|positions?|openings?|opportunities?|i|want|need|looking)\b'
+)
+_WHITESPACE_RE = re.compile(r'\s+')
+_DIGIT_RE = re.compile(r'\d')
+
+
+def _apply_nlp_rules(rules, remaining):
+    """
+    Strip the first matching rule's pattern from remaining in a single
+    subn() pass. Returns (remaining, value), value None if nothing matched.
+    """
+    for pattern, value in rules:
+        remaining, count = pattern.subn('', remaining)
+        if count:
+            return remaining, value
+    return remaining, None
+
 
 def _regex_parse_nlp_query(text):
     """Regex-based fallback for parsing natural language job queries."""
-    filters = {}
-    remaining = text.lower()
+    # Copy so callers can't mutate the memoized result
+    return dict(_regex_parse_nlp_query_cached(text))
 
-    # Remote / WFH / Hybrid / On-site
-    if re.search(r'\b(remote|wfh|work\s*from\s*home)\b', remaining):
-        filters["remote"] = "remote"
-        remaining = re.sub(r'\b(remote|wfh|work\s*from\s*home)\b', '', remaining)
-    elif re.search(r'\bhybrid\b', remaining):
-        filters["remote"] = "hybrid"
-        remaining = re.sub(r'\bhybrid\b', '', remaining)
-    elif re.search(r'\b(on[\s-]?site|office)\b', remaining):
-        filters["remote"] = "on-site"
-        remaining = re.sub(r'\b(on[\s-]?site|office)\b', '', remaining)
-
-    # Location (check city triggers)
-    for canonical, triggers in _NLP_CITY_TRIGGERS.items():
-        for trigger in triggers:
-            pattern = r'\b' + re.escape(trigger) + r'\b'
-            if re.search(pattern, remaining):
-                filters["location"] = canonical
-                remaining = re.sub(pattern, '', remaining)
-                break
-        if "location" in filters:
-            break
 
+def _parse_nlp_numbers(remaining, filters):
+    """
+    Pull salary and experience figures out of a query for
+    _regex_parse_nlp_query(), adding them to filters. Returns what is left
+    of remaining.
+    """
     # Salary: "above/more than/over/minimum X lakhs/lpa/L"
-    sal_min_match = re.search(
-        r'\b(?:above|over|more\s*than|minimum|min|>=?)\s*(\d+)\s*(?:lakhs?|lpa|l|lakh)\b',
-        remaining,
-    )
+    sal_min_match = _NLP_SALARY_MIN_RE.search(remaining)
     if sal_min_match:
         filters["salary_min"] = sal_min_match.group(1)
         remaining = remaining[:sal_min_match.start()] + remaining[sal_min_match.end():]
 
     # Salary: "below/under/less than/maximum X lakhs"
-    sal_max_match = re.search(
-        r'\b(?:below|under|less\s*than|maximum|max|<=?)\s*(\d+)\s*(?:lakhs?|lpa|l|lakh)\b',
-        remaining,
-    )
+    sal_max_match = _NLP_SALARY_MAX_RE.search(remaining)
     if sal_max_match:
         filters["salary_max"] = sal_max_match.group(1)
         remaining = remaining[:sal_max_match.start()] + remaining[sal_max_match.end():]
 
     # Salary range: "X-Y lakhs"
-    sal_range_match = re.search(
-        r'\b(\d+)\s*[-to]+\s*(\d+)\s*(?:lakhs?|lpa|l|lakh)\b', remaining,
-    )
+    sal_range_match = _NLP_SALARY_RANGE_RE.search(remaining)
     if sal_range_match and "salary_min" not in filters:
         filters["salary_min"] = sal_range_match.group(1)
         filters["salary_max"] = sal_range_match.group(2)
         remaining = remaining[:sal_range_match.start()] + remaining[sal_range_match.end():]
 
     # Experience: "X-Y years" or "X+ years"
-    exp_match = re.search(r'\b(\d+)\s*[-to]+\s*(\d+)\s*(?:years?|yrs?)\b', remaining)
+    exp_match = _NLP_EXP_RANGE_RE.search(remaining)
     if exp_match:
         lo, hi = int(exp_match.group(1)), int(exp_match.group(2))
         if lo <= 3 and hi <= 3:
@@ -749,7 +1443,7 @@ def _regex_parse_nlp_query(text):
             filters["experience"] = "12+"
         remaining = remaining[:exp_match.start()] + remaining[exp_match.end():]
     else:
-        exp_plus_match = re.search(r'\b(\d+)\+?\s*(?:years?|yrs?)\b', remaining)
+        exp_plus_match = _NLP_EXP_PLUS_RE.search(remaining)
         if exp_plus_match:
             yrs = int(exp_plus_match.group(1))
             if yrs <= 3:
@@ -762,43 +1456,62 @@ def _regex_parse_nlp_query(text):
                 filters["experience"] = "12+"
             remaining = remaining[:exp_plus_match.start()] + remaining[exp_plus_match.end():]
 
+    return remaining
+
+
+@lru_cache(maxsize=1024)
+def _regex_parse_nlp_query_cached(text):
+    """_regex_parse_nlp_query() body, memoized: the UI re-sends the same queries."""
+    filters = {}
+    remaining = text.lower()
+
+    # Remote / WFH / Hybrid / On-site
+    remaining, remote = _apply_nlp_rules(_NLP_REMOTE_RULES, remaining)
+    if remote:
+        filters["remote"] = remote
+
+    # Location (check city triggers)
+    mentioned = {m.lastgroup for m in _NLP_CITY_ANY_RE.finditer(remaining)}
+    for group, canonical, patterns in _NLP_CITY_RES:
+        if group not in mentioned:
+            continue
+        for pattern in patterns:
+            remaining, count = pattern.subn('', remaining)
+            if count:
+                filters["location"] = canonical
+                break
+        if "location" in filters:
+            break
+
+    # Salary and experience figures all need a digit; most queries have none
+    if _DIGIT_RE.search(remaining):
+        remaining = _parse_nlp_numbers(remaining, filters)
+
     # Seniority keywords → experience
     if "experience" not in filters:
-        if re.search(r'\b(entry[\s-]?level|fresher|junior)\b', remaining):
-            filters["experience"] = "0-3"
-            remaining = re.sub(r'\b(entry[\s-]?level|fresher|junior)\b', '', remaining)
-        elif re.search(r'\b(senior|lead|principal|staff)\b', remaining):
-            filters["experience"] = "7-12"
-            remaining = re.sub(r'\b(senior|lead|principal|staff)\b', '', remaining)
+        remaining, experience = _apply_nlp_rules(_NLP_SENIORITY_RULES, remaining)
+        if experience:
+            filters["experience"] = experience
 
     # Company type
-    if re.search(r'\bstartup\b', remaining):
-        filters["company_type"] = "startup"
-        remaining = re.sub(r'\bstartup\b', '', remaining)
-    elif re.search(r'\b(corporate|mnc|enterprise)\b', remaining):
-        filters["company_type"] = "corporate"
-        remaining = re.sub(r'\b(corporate|mnc|enterprise)\b', '', remaining)
+    remaining, company_type = _apply_nlp_rules(_NLP_COMPANY_TYPE_RULES, remaining)
+    if company_type:
+        filters["company_type"] = company_type
 
     # Sort preference
-    if re.search(r'\b(newest|latest|recent)\b', remaining):
-        filters["sort"] = "date_desc"
-        remaining = re.sub(r'\b(newest|latest|recent)\b', '', remaining)
-    elif re.search(r'\b(highest\s*score|best\s*match)\b', remaining):
-        filters["sort"] = "score_desc"
-        remaining = re.sub(r'\b(highest\s*score|best\s*match)\b', '', remaining)
+    remaining, sort = _apply_nlp_rules(_NLP_SORT_RULES, remaining)
+    if sort:
+        filters["sort"] = sort
 
     # Application status
-    if re.search(r"\b(haven'?t applied|not applied|unapplied|new)\b", remaining):
+    if _NLP_UNAPPLIED_RE.search(remaining):
         filters["applied"] = "none"
-        remaining = re.sub(r"\b(haven'?t applied|not applied|unapplied)\b", '', remaining)
+        remaining = _NLP_UNAPPLIED_PHRASE_RE.sub('', remaining)
 
     # Clean up remaining text as search query
     # Remove filler words
-    remaining = re.sub(
-        r'\b(show|me|find|get|search|for|in|with|at|the|a|an|and|or|jobs?|roles?|positions?|openings?|opportunities?|i|want|need|looking)\b',
-        '', remaining,
-    )
-    remaining = re.sub(r'\s+', ' ', remaining).strip()
+    remaining = _NLP_FILLER_RE.sub('', remaining)
+    remaining = _WHITESPACE_RE.sub(' ', remaining).strip()
 
     if remaining:
         filters["search"] = remaining
@@ -841,6 +1554,28 @@ def _sanitize_nlp_filters(raw_filters):
     }
 
 
+# Successful OpenRouter parses by query text, most recently used last, so a
+# repeated query skips the HTTP round-trip. Failures are not cached.
+_OPENROUTER_NLP_CACHE = OrderedDict()
+_OPENROUTER_NLP_CACHE_SIZE = 256
+_openrouter_nlp_cache_lock = threading.Lock()
+
+
+# Checked once: a failed "from openai import" is retried (and re-walks
+# sys.path) on every call, and importing openai eagerly slows app startup.
+_HAVE_OPENAI = importlib.util.find_spec("openai") is not None
+
+
+@lru_cache(maxsize=2)
+def _openrouter_client(api_key):
+    """
+    Shared OpenRouter client per API key, so NLP queries reuse its pooled
+    HTTPS connection. Raises ImportError if openai is missing.
+    """
+    from openai import OpenAI
+    return OpenAI(base_url="https://openrouter.ai/api/v1", api_key=api_key)
+
+
 def _openrouter_parse_nlp_query(text):
     """
     Use OpenRouter (meta-llama/llama-3.1-8b-instruct:free) to parse a
@@ -851,18 +1586,18 @@ def _openrouter_parse_nlp_query(text):
     if not api_key:
         return None
 
-    try:
-        from openai import OpenAI
-    except ImportError:
+    with _openrouter_nlp_cache_lock:
+        cached = _OPENROUTER_NLP_CACHE.get(text)
+        if cached is not None:
+            _OPENROUTER_NLP_CACHE.move_to_end(text)
+            return dict(cached)
+
+    if not _HAVE_OPENAI:
         logger.info("openai package not installed, skipping OpenRouter NLP")
         return None
 
     try:
-        client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=api_key,
-        )
-
+        client = _openrouter_client(api_key)
         prompt = _NLP_EXTRACTION_PROMPT.format(text=text)
         response = client.chat.completions.create(
             model="google/gemma-3-27b-it:free",
@@ -872,11 +1607,14 @@ def _openrouter_parse_nlp_query(text):
         content = response.choices[0].message.content.strip()
 
         # Extract JSON from response
-        json_match = re.search(r'\{[^{}]*\}', content)
-        if json_match:
-            filters = json.loads(json_match.group())
+        filters = _extract_json(content)
+        if filters is not None:
             filters = _sanitize_nlp_filters(filters)
             logger.info("NLP query parsed via OpenRouter: %s → %s", text, filters)
+            with _openrouter_nlp_cache_lock:
+                _OPENROUTER_NLP_CACHE[text] = dict(filters)
+                if len(_OPENROUTER_NLP_CACHE) > _OPENROUTER_NLP_CACHE_SIZE:
+                    _OPENROUTER_NLP_CACHE.popitem(last=False)
             return filters
 
         logger.warning("OpenRouter NLP parse returned non-JSON: %s", content[:200])
@@ -908,7 +1646,7 @@ def parse_nlp_query(text, config=None):
     use_ollama = config.get("scoring", {}).get("use_ollama", True)
     if use_ollama:
         try:
-            import ollama as ollama_client
+            ollama_client = _ollama_client(config.get("scoring", {}).get("ollama_timeout", 60))
 
             model = config.get("scoring", {}).get("ollama_model", "mistral")
 
@@ -917,14 +1655,15 @@ def parse_nlp_query(text, config=None):
             response = ollama_client.chat(
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
-                options={"temperature": 0.1},
+                format="json",
+                options={"temperature": 0.1, "num_predict": 256},
+                keep_alive=_OLLAMA_KEEP_ALIVE,
             )
             content = response["message"]["content"].strip()
 
             # Extract JSON from response
-            json_match = re.search(r'\{[^{}]*\}', content)
-            if json_match:
-                filters = json.loads(json_match.group())
+            filters = _extract_json(content)
+            if filters is not None:
                 filters = _sanitize_nlp_filters(filters)
                 logger.info("NLP query parsed via Ollama: %s → %s", text, filters)
                 return filters
@@ -947,8 +1686,6 @@ def parse_nlp_query(text, config=None):
 # CV Upload and Matching
 # =============================================================================
 
-from datetime import datetime as _datetime
-
 CV_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cv_data.json")
 
 # Shared skill pattern dict: {regex_pattern: display_label}
@@ -1044,8 +1781,121 @@ _SKILL_PATTERNS = {
     r"Hadoop": "Hadoop",
 }
 
-# Backward-compatible alias used by parse_cv_text()
-_CV_SKILL_PATTERNS = _SKILL_PATTERNS
+# Compiled once, in priority order. A single alternation regex was measured
+# ~4x slower: CPython's re has no DFA, so it tries every branch at every
+# position and loses the literal-prefix scan each separate pattern gets.
+_SKILL_REGEXES = [
+    (re.compile(pattern, re.IGNORECASE), display)
+    for pattern, display in _SKILL_PATTERNS.items()
+]
+
+
+def _skill_literal(pattern):
+    """
+    (lowercase literal, needs left boundary, needs right boundary) for a
+    skill pattern that is plain text apart from word-boundary anchors and
+    [Xx] case classes, else None.
+    """
+    left = pattern.startswith(r"\b")
+    right = pattern.endswith(r"\b")
+    core = pattern[2 if left else 0:-2 if right else None]
+    core = re.sub(
+        r"\[([A-Za-z])([A-Za-z])\]",
+        lambda m: m.group(1) if m.group(1).lower() == m.group(2).lower() else m.group(0),
+        core,
+    )
+    if re.search(r"[\\\[\](){}?*+|.^$]", core):
+        return None
+    return core.lower(), left, right
+
+
+def _build_skill_matcher():
+    """
+    Split _SKILL_PATTERNS into an Aho-Corasick automaton over the plain
+    literals and the few real regexes left over. (None, _SKILL_REGEXES)
+    without pyahocorasick.
+    """
+    if ahocorasick is None:
+        return None, _SKILL_REGEXES
+    literals = {}
+    residual = []
+    for (regex, display), pattern in zip(_SKILL_REGEXES, _SKILL_PATTERNS):
+        literal = _skill_literal(pattern)
+        if literal is None:
+            residual.append((regex, display))
+        else:
+            word, left, right = literal
+            literals.setdefault(word, []).append((display, left, right))
+    automaton = ahocorasick.Automaton()
+    for word, entries in literals.items():
+        automaton.add_word(word, (len(word), entries))
+    automaton.make_automaton()
+    return automaton, residual
+
+
+_SKILL_AUTOMATON, _SKILL_RESIDUAL_REGEXES = _build_skill_matcher()
+_SKILL_ORDER = list(_SKILL_PATTERNS.values())
+
+
+def _is_word_char(ch):
+    """Same notion of a word character as a str regex's word boundary uses."""
+    return ch.isalnum() or ch == "_"
+
+
+def _match_skills(text_lower):
+    """Set of skill display names whose pattern occurs in text_lower."""
+    matched = {display for regex, display in _SKILL_RESIDUAL_REGEXES if regex.search(text_lower)}
+    last = len(text_lower) - 1
+    for end, (length, entries) in _SKILL_AUTOMATON.iter(text_lower):
+        start = end - length + 1
+        for display, left, right in entries:
+            if left and start > 0 and _is_word_char(text_lower[start - 1]):
+                continue
+            if right and end < last and _is_word_char(text_lower[end + 1]):
+                continue
+            matched.add(display)
+    return matched
+
+
+def _pdfium_text(stream):
+    """Page texts via pdfium's native text extraction, joined by newlines."""
+    pdf = pdfium.PdfDocument(stream)
+    try:
+        page_texts = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            # pdfium ends lines with \r\n
+            page_texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+            textpage.close()
+            page.close()
+        return "\n".join(page_texts)
+    finally:
+        pdf.close()
+
+
+def extract_pdf_text(stream):
+    """
+    Text of every page of a PDF file object, joined by newlines. Uses pdfium
+    when pypdfium2 is installed (it ships with pdfplumber), which needs only
+    the raw text and is much faster than pdfplumber's Python layout pass.
+    Otherwise, or if pdfium rejects the file, falls back to pdfplumber.
+    Raises if neither can parse the PDF.
+    """
+    if pdfium is not None:
+        try:
+            return _pdfium_text(stream)
+        except pdfium.PdfiumError as e:
+            logger.warning("pdfium could not read the PDF (%s), trying pdfplumber", e)
+            stream.seek(0)
+
+    import pdfplumber
+    with pdfplumber.open(stream) as pdf:
+        page_texts = []
+        for page in pdf.pages:
+            page_texts.append(page.extract_text() or "")
+            # Drop the page's cached layout objects before the next one
+            page.close()
+        return "\n".join(page_texts)
 
 
 def parse_cv_text(text):
@@ -1056,16 +1906,13 @@ def parse_cv_text(text):
         text: Raw text content of the CV
 
     Returns:
-        dict with keys: skills (list), raw_text (str), uploaded_at (str)
+        dict with keys: skills (list), raw_text (str), uploaded_at (str,
+        empty for blank text since nothing is stored for it)
     """
     if not text or not text.strip():
-        return {"skills": [], "raw_text": text or "", "uploaded_at": _datetime.now().isoformat()}
+        return {"skills": [], "raw_text": text or "", "uploaded_at": ""}
 
-    found_skills = []
-    for pattern, display in _CV_SKILL_PATTERNS.items():
-        if re.search(pattern, text, re.IGNORECASE):
-            if display not in found_skills:
-                found_skills.append(display)
+    found_skills = extract_skills(text, max_skills=None)
 
     return {
         "skills": found_skills,
@@ -1074,21 +1921,101 @@ def parse_cv_text(text):
     }
 
 
+# (path, mtime_ns) -> parsed cv_data.json, so the CV page, rescoring and
+# gap analysis don't re-parse a file that only changes on upload
+_cv_data_cache = {}
+_cv_data_cache_lock = threading.Lock()
+
+
 def load_cv_data():
     """Load stored CV data from cv_data.json. Returns None if not uploaded yet."""
-    if not os.path.exists(CV_DATA_PATH):
+    try:
+        key = (CV_DATA_PATH, os.stat(CV_DATA_PATH).st_mtime_ns)
+    except OSError:
         return None
+    with _cv_data_cache_lock:
+        if key in _cv_data_cache:
+            return copy.deepcopy(_cv_data_cache[key])
     try:
         with open(CV_DATA_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
+            cv_data = json.load(f)
     except Exception:
         return None
+    with _cv_data_cache_lock:
+        _cv_data_cache.clear()
+        _cv_data_cache[key] = cv_data
+    return copy.deepcopy(cv_data)
 
 
 def save_cv_data(cv_data):
     """Save CV data dict to cv_data.json."""
     with open(CV_DATA_PATH, "w", encoding="utf-8") as f:
         json.dump(cv_data, f, indent=2)
+    # Don't rely on mtime resolution for our own writes
+    with _cv_data_cache_lock:
+        _cv_data_cache.clear()
+
+
+# Words of 4+ characters, for cv_score()'s overlap fallback
+_WORD_RE = re.compile(r'\b\w{4,}\b')
+
+
+@lru_cache(maxsize=8)
+def _cv_words(raw_text):
+    """Word set of a CV's raw text; tokenized once per CV, not once per scored job."""
+    return frozenset(_WORD_RE.findall(raw_text.lower()))
+
+
+@lru_cache(maxsize=8)
+def _cv_skill_index(skills):
+    """
+    Lowercased CV skill -> original name, for a tuple of CV skills. Built
+    once per CV: cv_data lives in JSON, so it can't carry the index itself.
+    Treat it as read-only.
+    """
+    return {s.lower(): s for s in skills}
+
+
+@lru_cache(maxsize=1024)
+def _jd_skills(jd_text):
+    """
+    Up to 20 skills from a JD. Memoized: CV rescoring and gap analysis keep
+    revisiting the same jobs.
+    """
+    return tuple(extract_skills(jd_text, max_skills=20))
+
+
+# Tags stored JD skill lists with the skill vocabulary they came from, so
+# lists computed before a _SKILL_PATTERNS change are recomputed
+_SKILL_VOCAB_TAG = hashlib.blake2b(repr(_SKILL_PATTERNS).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def attach_jd_skills(jobs):
+    """
+    Replace each job's stored "jd_skills" column value (JSON) with the
+    decoded skills tuple that cv_score() uses, extracting it from the JD
+    when the stored value is missing or from another vocabulary. Returns
+    [(jd_skills_json, job_id)] for the rows whose stored value needs writing.
+    """
+    stale = []
+    for job in jobs:
+        stored = job.get("jd_skills")
+        skills = None
+        if stored:
+            try:
+                data = _json_loads(stored)
+                if data.get("vocab") == _SKILL_VOCAB_TAG:
+                    skills = tuple(data["skills"])
+            except (ValueError, TypeError, KeyError, AttributeError):
+                pass
+        if skills is None:
+            skills = _jd_skills(" ".join([job.get("role", ""), job.get("job_description", "")]))
+            stale.append((
+                json.dumps({"vocab": _SKILL_VOCAB_TAG, "skills": list(skills)}),
+                job["job_id"],
+            ))
+        job["jd_skills"] = skills
+    return stale
 
 
 def cv_score(job, cv_data):
@@ -1104,21 +2031,39 @@ def cv_score(job, cv_data):
     """
     if not cv_data:
         return 0
+    cv_skills_lower = _cv_skill_index(tuple(cv_data.get("skills", [])))
+    return _cv_score_with(job, cv_skills_lower, cv_data.get("raw_text", ""))
+
+
+def cv_scores(jobs, cv_data):
+    """
+    cv_score() for many jobs against one CV, in order. The CV side is
+    prepared once for the whole batch instead of once per job.
+    """
+    if not cv_data:
+        return [0] * len(jobs)
+    cv_skills_lower = _cv_skill_index(tuple(cv_data.get("skills", [])))
+    raw_text = cv_data.get("raw_text", "")
+    return [_cv_score_with(job, cv_skills_lower, raw_text) for job in jobs]
+
 
-    cv_skills_lower = {s.lower() for s in cv_data.get("skills", [])}
+def _cv_score_with(job, cv_skills_lower, cv_raw_text):
+    """cv_score() body, given the CV's _cv_skill_index() and raw text."""
     if not cv_skills_lower:
         return 0
 
     jd_text = " ".join([job.get("role", ""), job.get("job_description", "")])
-    jd_skills = extract_skills(jd_text, max_skills=20)
+    jd_skills = job.get("jd_skills")
+    if not isinstance(jd_skills, tuple):
+        # Not prepared by attach_jd_skills()
+        jd_skills = _jd_skills(jd_text)
 
     if not jd_skills:
         # If no specific skills extracted from JD, fall back to keyword overlap
-        jd_words = set(re.findall(r'\b\w{4,}\b', jd_text.lower()))
-        cv_words = set(re.findall(r'\b\w{4,}\b', cv_data.get("raw_text", "").lower()))
-        common = jd_words & cv_words
+        jd_words = set(_WORD_RE.findall(jd_text.lower()))
         if not jd_words:
             return 0
+        common = jd_words & _cv_words(cv_raw_text)
         return min(int(len(common) / len(jd_words) * 100), 100)
 
     jd_skills_lower = [s.lower() for s in jd_skills]
@@ -1167,9 +2112,9 @@ def compute_gap_analysis(job, cv_data):
             "action_steps": ["Upload your CV on the CV page to see personalized gap analysis."],
         }
 
-    cv_skills_lower = {s.lower(): s for s in cv_data.get("skills", [])}
+    cv_skills_lower = _cv_skill_index(tuple(cv_data.get("skills", [])))
     jd_text = " ".join([job.get("role", ""), job.get("job_description", "")])
-    jd_skills = extract_skills(jd_text, max_skills=20)
+    jd_skills = _jd_skills(jd_text)
 
     if not jd_skills:
         return {
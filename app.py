@@ -6,6 +6,7 @@ viewing jobs, and browsing digests.
 
 import os
 import sys
+import json
 import logging
 import threading
 from datetime import datetime, timedelta
@@ -21,29 +22,39 @@ from flask import (
     Flask, render_template, request, redirect, url_for,
     flash, jsonify, send_from_directory,
 )
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Ensure project root is on the path so we can import sibling modules
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
-from main import load_config, load_preferences, save_preferences, DEFAULT_PREFS, apply_env_overrides, _CREDENTIAL_KEYS
+from main import load_preferences, save_preferences, cached_config, cached_prefs, DEFAULT_PREFS, _CREDENTIAL_KEYS
 from database import (
-    init_db, get_connection, get_comprehensive_stats, get_portal_quality_stats,
+    init_db, get_connection, get_thread_connection,
+    get_comprehensive_stats, get_portal_quality_stats,
     update_applied_status, insert_jobs_bulk, generate_job_id, mark_sent_in_digest,
-    get_unsent_jobs, update_job_contacts, get_distinct_locations,
+    get_unsent_jobs, update_job_contacts_bulk, get_distinct_locations, get_distinct_portals,
     get_normalized_locations, normalize_location, _CITY_PATTERNS,
     get_application_pipeline_stats, get_best_matching_categories,
     get_application_activity, get_recommended_actions,
-    hide_job, update_job_notes, dedup_jobs,
+    hide_job, update_job_notes, dedup_jobs, jobs_fts_enabled,
     _INTERNATIONAL_CANONICALS, _INTERNATIONAL_KEYWORDS,
 )
 from scrapers import scrape_all_portals
-from analyzer import analyze_jobs, generate_tailored_points, parse_nlp_query, parse_cv_text, cv_score, compute_gap_analysis, load_cv_data, save_cv_data, CV_DATA_PATH
+from analyzer import analyze_jobs, generate_tailored_points, parse_nlp_query, parse_cv_text, extract_pdf_text, cv_scores, attach_jd_skills, compute_gap_analysis, load_cv_data, save_cv_data, CV_DATA_PATH
 from digest_generator import generate_digest, get_latest_digest, DIGEST_DIR
 from email_notifier import send_job_email
 from contact_scraper import enrich_jobs_with_contacts
-from telegram_notifier import send_telegram_alert, send_telegram_batch_summary
+from telegram_notifier import (
+    send_telegram_alerts_batch, send_telegram_batch_summary,
+    queue_telegram_alerts_batch, queue_telegram_batch_summary,
+)
 from telegram_bot import start_telegram_bot
 
 # ---------------------------------------------------------------------------
@@ -52,17 +63,57 @@ from telegram_bot import start_telegram_bot
 
 _IS_VERCEL = bool(os.environ.get("VERCEL"))
 
+# Which credential fields are set via env vars (fixed for the process), so
+# the preferences page can say so instead of showing an input
+_ENV_CREDENTIALS = {
+    "gmail_app_password": bool(os.environ.get("GMAIL_APP_PASSWORD")),
+    "telegram_bot_token": bool(os.environ.get("TELEGRAM_BOT_TOKEN")),
+    "apollo_api_key": bool(os.environ.get("APOLLO_API_KEY")),
+}
+
+
+class _OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask's JSON provider with orjson doing the encoding. Keys stay sorted
+    and dates still go through Flask's default() (HTTP date format); the
+    stdlib encoder handles pretty-printing (debug mode) and anything orjson
+    rejects, such as integers wider than 64 bits.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.get("indent") is not None or kwargs.keys() - {"separators"}:
+            return super().dumps(obj, **kwargs)
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, **kwargs)
+
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = _OrjsonProvider(app)
 app.secret_key = os.environ.get("FLASK_SECRET", "job-search-agent-dev-key")
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Spawned worker processes (analyzer process pools) re-import the entry
+# script as __mp_main__; they must not migrate the DB or start schedulers.
+_IS_SPAWNED_WORKER = __name__ == "__mp_main__"
+
 # Initialize the database on startup
-try:
-    init_db()
-except Exception as e:
-    logger.warning("Database init warning (may be expected on Vercel): %s", e)
+if not _IS_SPAWNED_WORKER:
+    try:
+        init_db()
+    except Exception as e:
+        logger.warning("Database init warning (may be expected on Vercel): %s", e)
 
 # ---------------------------------------------------------------------------
 # Background scraper state
@@ -172,7 +223,7 @@ def setup_background_scheduler():
         from apscheduler.schedulers.background import BackgroundScheduler
         from apscheduler.triggers.cron import CronTrigger
 
-        prefs = apply_env_overrides(load_preferences() or DEFAULT_PREFS.copy())
+        prefs = cached_prefs()
         digest_time = prefs.get("digest_time", "11:00 AM")
         hour, minute = _parse_digest_time(digest_time)
 
@@ -194,38 +245,32 @@ def setup_background_scheduler():
 
 def _run_apollo_enrichment(job_ids):
     """Run contact enrichment for a list of job IDs using the contact scraper."""
-    conn = get_connection()
+    conn = get_thread_connection()
     cursor = conn.cursor()
-    placeholders = ",".join("?" for _ in job_ids)
+    # One JSON parameter instead of a placeholder per id: no bound-parameter
+    # limit, and the statement text stays the same for every run
     cursor.execute(
-        f"SELECT job_id, company, job_description, apply_url FROM job_listings "
-        f"WHERE job_id IN ({placeholders}) "
-        f"AND (poster_email IS NULL OR poster_email = '')",
-        job_ids,
+        "SELECT job_id, company, job_description, apply_url FROM job_listings "
+        "WHERE job_id IN (SELECT value FROM json_each(?)) "
+        "AND (poster_email IS NULL OR poster_email = '')",
+        (json.dumps(job_ids),),
     )
     rows = [dict(r) for r in cursor.fetchall()]
-    conn.close()
 
     if not rows:
         return
 
     contacts = enrich_jobs_with_contacts(rows)
-    for jid, info in contacts.items():
-        update_job_contacts(
-            jid,
-            info.get("poster_name", ""),
-            info.get("poster_email", ""),
-            info.get("poster_phone", ""),
-            info.get("poster_linkedin", ""),
-        )
+    if contacts:
+        update_job_contacts_bulk(contacts)
 
 
 def _run_scraper_pipeline():
     """Run the full pipeline in a background thread."""
     global scraper_status
     try:
-        config = load_config()
-        preferences = apply_env_overrides(load_preferences() or DEFAULT_PREFS.copy())
+        config = cached_config()
+        preferences = cached_prefs()
         job_titles = preferences.get("job_titles", DEFAULT_PREFS["job_titles"])
         locations = preferences.get("locations", DEFAULT_PREFS["locations"])
         top_n = preferences.get("top_jobs_per_digest", 5)
@@ -287,14 +332,13 @@ def _run_scraper_pipeline():
         if tg_token and tg_chat:
             with scraper_lock:
                 scraper_status["phase"] = "telegram_alerts"
-            alert_count = 0
-            for job in qualified_jobs:
-                if job.get("relevance_score", 0) >= tg_min:
-                    send_telegram_alert(job, tg_token, tg_chat)
-                    alert_count += 1
+            # Queued: the sends happen in the background while enrichment runs
+            alert_jobs = [j for j in qualified_jobs if j.get("relevance_score", 0) >= tg_min]
+            queue_telegram_alerts_batch(alert_jobs, tg_token, tg_chat)
+            alert_count = len(alert_jobs)
             if alert_count > 0 or inserted > 0:
-                send_telegram_batch_summary(len(all_jobs), len(qualified_jobs), inserted, tg_token, tg_chat)
-            logger.info("Sent %d Telegram alerts", alert_count)
+                queue_telegram_batch_summary(len(all_jobs), len(qualified_jobs), inserted, tg_token, tg_chat)
+            logger.info("Queued %d Telegram alerts", alert_count)
 
         # Phase 3.6: Contact enrichment (via scraper, no API key needed)
         with scraper_lock:
@@ -351,8 +395,8 @@ def _run_live_search(query, location):
     """Run a slim scrape+analyze+store pipeline for live search from the jobs page."""
     global live_search_status
     try:
-        config = load_config()
-        preferences = apply_env_overrides(load_preferences() or DEFAULT_PREFS.copy())
+        config = cached_config()
+        preferences = cached_prefs()
 
         job_titles = [query] if query else preferences.get("job_titles", DEFAULT_PREFS["job_titles"])
         locations_list = [location] if location else preferences.get("locations", DEFAULT_PREFS["locations"])
@@ -416,9 +460,10 @@ def _run_live_search(query, location):
         if tg_token and tg_chat:
             with live_search_lock:
                 live_search_status["phase"] = "telegram_alerts"
-            for job in qualified_jobs:
-                if job.get("relevance_score", 0) >= tg_min:
-                    send_telegram_alert(job, tg_token, tg_chat)
+            queue_telegram_alerts_batch(
+                [j for j in qualified_jobs if j.get("relevance_score", 0) >= tg_min],
+                tg_token, tg_chat,
+            )
 
         # Phase 4: Contact enrichment (via scraper, no API key needed)
         if result_ids:
@@ -458,7 +503,7 @@ def _is_gunicorn_arbiter():
 
 
 def _should_start_background_tasks():
-    if _IS_VERCEL:
+    if _IS_VERCEL or _IS_SPAWNED_WORKER:
         return False
     # Flask dev server with reloader
     if app.debug:
@@ -471,7 +516,7 @@ if _should_start_background_tasks():
     setup_background_scheduler()
 
     # Start Telegram bot if token is configured
-    _bot_prefs = apply_env_overrides(load_preferences() or DEFAULT_PREFS.copy())
+    _bot_prefs = cached_prefs()
     _bot_token = _bot_prefs.get("telegram_bot_token", "").strip()
     if _bot_token:
         start_telegram_bot(_bot_token)
@@ -506,6 +551,20 @@ def dashboard():
     )
 
 
+# The default "hide international jobs" filter never changes, so its SQL and
+# params are built once rather than on every /jobs and NLP search request.
+_INTERNATIONAL_PARAMS = tuple(_INTERNATIONAL_CANONICALS) + tuple(
+    f"%{kw}%" for kw in _INTERNATIONAL_KEYWORDS
+)
+_INTERNATIONAL_CONDITION = (
+    "(location IS NULL OR location = '' OR "
+    "(location NOT IN ({}) AND NOT ({})))".format(
+        ",".join("?" for _ in _INTERNATIONAL_CANONICALS),
+        " OR ".join("LOWER(location) LIKE ?" for _ in _INTERNATIONAL_KEYWORDS),
+    )
+)
+
+
 def _build_jobs_query(filters):
     """
     Build SQL WHERE clause and params from a filters dict.
@@ -535,15 +594,8 @@ def _build_jobs_query(filters):
     # chosen (in which case the user knows what they're filtering to) or
     # show_international is explicitly set.
     if not filters.get("location") and not filters.get("show_international"):
-        intl = list(_INTERNATIONAL_CANONICALS)
-        intl_ph = ",".join("?" for _ in intl)
-        kw_conds = " OR ".join("LOWER(location) LIKE ?" for _ in _INTERNATIONAL_KEYWORDS)
-        conditions.append(
-            f"(location IS NULL OR location = '' OR "
-            f"(location NOT IN ({intl_ph}) AND NOT ({kw_conds})))"
-        )
-        params.extend(intl)
-        params.extend(f"%{kw}%" for kw in _INTERNATIONAL_KEYWORDS)
+        conditions.append(_INTERNATIONAL_CONDITION)
+        params.extend(_INTERNATIONAL_PARAMS)
 
     # Default minimum score filter (0 = show all)
     try:
@@ -555,9 +607,18 @@ def _build_jobs_query(filters):
         params.append(min_score_val)
 
     if search:
-        conditions.append("(role LIKE ? OR company LIKE ? OR job_description LIKE ?)")
-        like = f"%{search}%"
-        params.extend([like, like, like])
+        # The trigram index needs 3+ characters. LIKE wildcards in the term
+        # and non-ASCII case folding only behave identically under LIKE.
+        if (
+            len(search) >= 3 and search.isascii() and not ("%" in search or "_" in search)
+            and jobs_fts_enabled()
+        ):
+            conditions.append("rowid IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)")
+            params.append('"' + search.replace('"', '""') + '"')
+        else:
+            conditions.append("(role LIKE ? OR company LIKE ? OR job_description LIKE ?)")
+            like = f"%{search}%"
+            params.extend([like, like, like])
     if portal:
         conditions.append("portal = ?")
         params.append(portal)
@@ -568,11 +629,10 @@ def _build_jobs_query(filters):
         conditions.append("company_type = ?")
         params.append(company_type)
     if location:
-        city_patterns = _CITY_PATTERNS.get(location)
-        if city_patterns:
-            like_clauses = ["location LIKE ?" for _ in city_patterns]
-            conditions.append("(" + " OR ".join(like_clauses) + ")")
-            params.extend([f"%{p}%" for p in city_patterns])
+        if location in _CITY_PATTERNS:
+            # Same canonical name the dropdown counts come from
+            conditions.append("location_canonical = ?")
+            params.append(location)
         else:
             conditions.append("location LIKE ?")
             params.append(f"%{location}%")
@@ -665,7 +725,7 @@ def jobs():
     conditions, params, order = _build_jobs_query(filters)
     where = " WHERE " + " AND ".join(conditions) if conditions else ""
 
-    conn = get_connection()
+    conn = get_thread_connection()
     cursor = conn.cursor()
 
     # Fetch all matching jobs (no pagination)
@@ -674,16 +734,11 @@ def jobs():
         params,
     )
     rows = [dict(r) for r in cursor.fetchall()]
-    conn.close()
 
     total = len(rows)
 
     # Get distinct portals for filter dropdown
-    conn2 = get_connection()
-    cur2 = conn2.cursor()
-    cur2.execute("SELECT DISTINCT portal FROM job_listings ORDER BY portal")
-    portals = [r["portal"] for r in cur2.fetchall()]
-    conn2.close()
+    portals = get_distinct_portals()
 
     # Get normalized locations for filter dropdown (canonical name + count)
     normalized_locs = get_normalized_locations()
@@ -705,7 +760,7 @@ def nlp_search():
     if not query:
         return jsonify({"ok": False, "error": "Empty query"}), 400
 
-    config = load_config()
+    config = cached_config()
     filters = parse_nlp_query(query, config)
 
     # Default min_score to 0 for NLP search (show all matching jobs)
@@ -715,18 +770,18 @@ def nlp_search():
     conditions, params, order = _build_jobs_query(filters)
     where = " WHERE " + " AND ".join(conditions) if conditions else ""
 
-    conn = get_connection()
+    conn = get_thread_connection()
     cursor = conn.cursor()
 
-    cursor.execute(f"SELECT COUNT(*) as cnt FROM job_listings{where}", params)
-    total = cursor.fetchone()["cnt"]
-
+    # One pass over the filtered rows: the window count is taken before LIMIT
     cursor.execute(
-        f"SELECT * FROM job_listings{where} ORDER BY {order} LIMIT 25",
+        f"SELECT *, COUNT(*) OVER () AS _total FROM job_listings{where} ORDER BY {order} LIMIT 25",
         params,
     )
     rows = [dict(r) for r in cursor.fetchall()]
-    conn.close()
+    total = rows[0]["_total"] if rows else 0
+    for row in rows:
+        del row["_total"]
 
     # Build human-readable filter descriptions
     filter_labels = []
@@ -799,7 +854,7 @@ def admin_dedup():
 
 @app.route("/preferences", methods=["GET", "POST"])
 def preferences():
-    config = load_config()
+    config = cached_config()
     if request.method == "POST":
         # Normalize digest_time: "11.00 AM" → "11:00 AM"
         raw_dt = request.form.get("digest_time", "11:00 AM").strip()
@@ -839,28 +894,21 @@ def preferences():
     # Pre-populate transferable_skills from defaults if the user hasn't set them yet
     if not prefs.get("transferable_skills"):
         prefs["transferable_skills"] = DEFAULT_PREFS["transferable_skills"]
-    # Tell the template which credential fields are set via env vars
-    env_credentials = {
-        "gmail_app_password": bool(os.environ.get("GMAIL_APP_PASSWORD")),
-        "telegram_bot_token": bool(os.environ.get("TELEGRAM_BOT_TOKEN")),
-        "apollo_api_key": bool(os.environ.get("APOLLO_API_KEY")),
-    }
-    return render_template("preferences.html", prefs=prefs, config=config, env_credentials=env_credentials)
+    return render_template("preferences.html", prefs=prefs, config=config, env_credentials=_ENV_CREDENTIALS)
 
 
 @app.route("/api/jobs/<job_id>/tailored-points")
 def tailored_points(job_id):
     """Generate tailored resume bullet points for a specific job."""
-    conn = get_connection()
+    conn = get_thread_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM job_listings WHERE job_id = ?", (job_id,))
     row = cursor.fetchone()
-    conn.close()
     if not row:
         return jsonify({"ok": False, "error": "Job not found"}), 404
     job = dict(row)
-    config = load_config()
-    preferences = apply_env_overrides(load_preferences() or DEFAULT_PREFS.copy())
+    config = cached_config()
+    preferences = cached_prefs()
     points = generate_tailored_points(job, preferences, config)
     return jsonify({"ok": True, "points": points})
 
@@ -898,19 +946,18 @@ def import_jobs():
     logger.info("Import API: inserted=%d, skipped=%d (total submitted=%d)", inserted, skipped, len(jobs))
 
     # Telegram alerts for qualified jobs
-    preferences = apply_env_overrides(load_preferences() or DEFAULT_PREFS.copy())
+    preferences = cached_prefs()
     tg_token = preferences.get("telegram_bot_token", "").strip()
     tg_chat = preferences.get("telegram_chat_id", "").strip()
     tg_min = int(preferences.get("telegram_min_score", 65))
     alert_count = 0
     if tg_token and tg_chat:
-        for job in jobs:
-            if job.get("relevance_score", 0) >= tg_min:
-                try:
-                    send_telegram_alert(job, tg_token, tg_chat)
-                    alert_count += 1
-                except Exception as e:
-                    logger.warning("Telegram alert failed for %s: %s", job.get("job_id"), e)
+        alert_jobs = [j for j in jobs if j.get("relevance_score", 0) >= tg_min]
+        if alert_jobs:
+            try:
+                alert_count = send_telegram_alerts_batch(alert_jobs, tg_token, tg_chat)
+            except Exception as e:
+                logger.warning("Telegram alerts failed: %s", e)
         if alert_count > 0 or inserted > 0:
             try:
                 send_telegram_batch_summary(len(jobs), alert_count, inserted, tg_token, tg_chat)
@@ -948,10 +995,20 @@ def start_scraper():
     return jsonify({"ok": True})
 
 
+def _status_snapshot(status):
+    """Copy a status dict deep enough to serialize it after the lock is released."""
+    snapshot = dict(status)
+    snapshot["portal_progress"] = dict(status.get("portal_progress") or {})
+    return snapshot
+
+
 @app.route("/api/scraper/status")
 def scraper_status_api():
+    # Only the copy happens under the lock; progress callbacks are not held
+    # up while the response is serialized
     with scraper_lock:
-        return jsonify(dict(scraper_status))
+        snapshot = _status_snapshot(scraper_status)
+    return jsonify(snapshot)
 
 
 # ---------------------------------------------------------------------------
@@ -993,7 +1050,8 @@ def start_live_search():
 @app.route("/api/search/status")
 def live_search_status_api():
     with live_search_lock:
-        return jsonify(dict(live_search_status))
+        snapshot = _status_snapshot(live_search_status)
+    return jsonify(snapshot)
 
 
 # ---------------------------------------------------------------------------
@@ -1017,18 +1075,42 @@ def scheduler_status():
 
 @app.route("/digests")
 def digests():
-    files = []
-    if os.path.isdir(DIGEST_DIR):
-        for f in sorted(os.listdir(DIGEST_DIR), reverse=True):
-            if f.endswith(".html"):
-                path = os.path.join(DIGEST_DIR, f)
-                mtime = os.path.getmtime(path)
-                files.append({
-                    "filename": f,
-                    "date": datetime.fromtimestamp(mtime).strftime("%B %d, %Y %I:%M %p"),
-                    "size_kb": round(os.path.getsize(path) / 1024, 1),
-                })
-    return render_template("digests.html", files=files)
+    return render_template("digests.html", files=_list_digests())
+
+
+# (directory mtime_ns, files) for /digests. Adding, removing or replacing a
+# digest (generate_digest writes via rename) changes the directory's mtime.
+_digest_listing = (None, [])
+_digest_listing_lock = threading.Lock()
+
+
+def _list_digests():
+    global _digest_listing
+    try:
+        dir_mtime = os.stat(DIGEST_DIR).st_mtime_ns
+    except OSError:
+        return []
+    with _digest_listing_lock:
+        if _digest_listing[0] == dir_mtime:
+            return list(_digest_listing[1])
+
+    entries = []
+    with os.scandir(DIGEST_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".html") and entry.is_file():
+                st = entry.stat()
+                entries.append((entry.name, st.st_mtime, st.st_size))
+    files = [
+        {
+            "filename": name,
+            "date": datetime.fromtimestamp(mtime).strftime("%B %d, %Y %I:%M %p"),
+            "size_kb": round(size / 1024, 1),
+        }
+        for name, mtime, size in sorted(entries, reverse=True)
+    ]
+    with _digest_listing_lock:
+        _digest_listing = (dir_mtime, files)
+    return list(files)
 
 
 @app.route("/digests/<filename>")
@@ -1059,9 +1141,9 @@ def upload_cv():
     text = ""
     if ext == "pdf":
         try:
-            import pdfplumber, io
-            with pdfplumber.open(io.BytesIO(f.read())) as pdf:
-                text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+            # Read from the upload's own stream (werkzeug spools large files
+            # to disk) rather than a second in-memory copy
+            text = extract_pdf_text(f.stream)
         except Exception as e:
             return jsonify({"ok": False, "error": f"PDF parsing failed: {e}"}), 400
     elif ext == "docx":
@@ -1098,26 +1180,31 @@ def rescore_jobs():
         return jsonify({"ok": False, "error": "No CV uploaded yet"}), 400
 
     conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT job_id, role, job_description FROM job_listings")
-    jobs = [dict(r) for r in cursor.fetchall()]
-    conn.close()
-
-    if not jobs:
-        return jsonify({"ok": True, "updated": 0, "message": "No jobs in database"})
-
-    conn = get_connection()
-    cursor = conn.cursor()
-    updated = 0
-    for job in jobs:
-        score = cv_score(job, cv_data)
+    try:
+        cursor = conn.cursor()
         cursor.execute(
-            "UPDATE job_listings SET cv_score = ? WHERE job_id = ?",
-            (score, job["job_id"]),
+            "SELECT job_id, role, job_description, cv_score, jd_skills FROM job_listings"
         )
-        updated += 1
-    conn.commit()
-    conn.close()
+        jobs = [dict(r) for r in cursor.fetchall()]
+
+        if not jobs:
+            return jsonify({"ok": True, "updated": 0, "message": "No jobs in database"})
+
+        # JD skills are extracted once per job and kept for the next rescore
+        stale_skills = attach_jd_skills(jobs)
+        cursor.executemany("UPDATE job_listings SET jd_skills = ? WHERE job_id = ?", stale_skills)
+
+        # Only rows whose score actually moved are written
+        rows = [
+            (score, job["job_id"])
+            for job, score in zip(jobs, cv_scores(jobs, cv_data))
+            if score != job["cv_score"]
+        ]
+        cursor.executemany("UPDATE job_listings SET cv_score = ? WHERE job_id = ?", rows)
+        conn.commit()
+    finally:
+        conn.close()
+    updated = len(jobs)
 
     logger.info("Re-scored %d jobs against CV", updated)
     return jsonify({"ok": True, "updated": updated})
@@ -1128,11 +1215,10 @@ def gap_analysis(job_id):
     """Return gap analysis for a specific job against the uploaded CV."""
     cv_data = load_cv_data()
 
-    conn = get_connection()
+    conn = get_thread_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM job_listings WHERE job_id = ?", (job_id,))
     row = cursor.fetchone()
-    conn.close()
 
     if not row:
         return jsonify({"ok": False, "error": "Job not found"}), 404
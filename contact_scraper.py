@@ -5,10 +5,18 @@ Replaces apollo_enricher.py. Uses three strategies in order:
   2. Scrape the company's website (careers/about/team page)
   3. Google search for HR contacts at the company
 """
+import json
+import os
 import re
+import sqlite3
 import time
 import logging
+import threading
 import requests
+from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
 from urllib.parse import quote_plus, urljoin
 
@@ -24,9 +32,37 @@ _HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
+# One keep-alive session shared by the scraper threads, so the page probes on
+# a company's site reuse one connection. Transient 5xx responses are retried
+# with backoff; 429 is not, so a rate-limiting Google is left alone.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504]),
+))
+
 _EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
 _LINKEDIN_RE = re.compile(r'linkedin\.com/in/([\w-]+)', re.IGNORECASE)
 
+# Companies are scraped concurrently (each mostly hits its own website), but
+# Google searches stay at least _GOOGLE_INTERVAL seconds apart, as polite as
+# the old one-company-at-a-time loop.
+_MAX_WORKERS = 4
+_GOOGLE_INTERVAL = 3.0
+_google_lock = threading.Lock()
+_google_next = 0.0
+
+# Persistent company -> scraped contacts cache, so the next scheduled run
+# does not scrape the same company sites and Google results again. Companies
+# nothing was found for are re-checked sooner.
+_DATA_DIR = "/tmp" if os.environ.get("VERCEL") else os.environ.get(
+    "DATA_DIR", os.path.dirname(os.path.abspath(__file__))
+)
+CONTACT_CACHE_PATH = os.path.join(_DATA_DIR, "contact_cache.db")
+CONTACT_CACHE_TTL = timedelta(days=7)
+CONTACT_CACHE_EMPTY_TTL = timedelta(days=1)
+
 # Domains to skip when found in JD text (noisy/irrelevant emails)
 _BLOCKED_EMAIL_DOMAINS = {"example.com", "test.com", "domain.com", "email.com", "yourcompany.com"}
 
@@ -53,7 +89,7 @@ def extract_contacts_from_text(text):
 def _scrape_page_for_contacts(url, timeout=8):
     """Fetch a URL and extract emails/LinkedIn URLs from its text content."""
     try:
-        resp = requests.get(url, headers=_HEADERS, timeout=timeout)
+        resp = _SESSION.get(url, headers=_HEADERS, timeout=timeout)
         resp.raise_for_status()
         soup = BeautifulSoup(resp.text, "lxml")
         # Remove script/style noise
@@ -114,7 +150,7 @@ def _google_search_contacts(company_name):
     url = f"https://www.google.com/search?q={quote_plus(query)}&num=5"
 
     try:
-        resp = requests.get(url, headers=_HEADERS, timeout=10)
+        resp = _SESSION.get(url, headers=_HEADERS, timeout=10)
         resp.raise_for_status()
         soup = BeautifulSoup(resp.text, "lxml")
         # Extract text from result snippets only
@@ -128,6 +164,90 @@ def _google_search_contacts(company_name):
         return [], []
 
 
+def _wait_for_google_slot():
+    """Block until the next Google search may start."""
+    global _google_next
+    with _google_lock:
+        now = time.monotonic()
+        start = max(now, _google_next)
+        _google_next = start + _GOOGLE_INTERVAL
+    if start > now:
+        time.sleep(start - now)
+
+
+def _scrape_company_contacts(company, apply_url):
+    """Strategies 2 + 3 for one company: its website, then Google."""
+    w_emails, w_linkedin = _try_company_website(company, apply_url)
+
+    g_emails, g_linkedin = [], []
+    if not w_emails and not w_linkedin:
+        _wait_for_google_slot()
+        g_emails, g_linkedin = _google_search_contacts(company)
+
+    return w_emails + g_emails, w_linkedin + g_linkedin
+
+
+def _contact_cache_connection():
+    conn = sqlite3.connect(CONTACT_CACHE_PATH, timeout=10)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS company_contacts ("
+        "company_key TEXT PRIMARY KEY, contacts TEXT NOT NULL, expires_at TEXT NOT NULL)"
+    )
+    return conn
+
+
+def _load_cached_contacts(company_keys):
+    """Unexpired cached (emails, linkedin_urls) per company key; missing keys are misses."""
+    if not company_keys:
+        return {}
+    cached = {}
+    try:
+        conn = _contact_cache_connection()
+        try:
+            now = datetime.now().isoformat()
+            for company_key in company_keys:
+                row = conn.execute(
+                    "SELECT contacts FROM company_contacts WHERE company_key = ? AND expires_at > ?",
+                    (company_key, now),
+                ).fetchone()
+                if row:
+                    emails, linkedin_urls = json.loads(row[0])
+                    cached[company_key] = (emails, linkedin_urls)
+        finally:
+            conn.close()
+    except (sqlite3.Error, ValueError) as e:
+        logger.debug("Contact cache read failed: %s", e)
+        return {}
+    return cached
+
+
+def _store_cached_contacts(scraped):
+    """Store scraped (emails, linkedin_urls) per company key. Cache failures never break enrichment."""
+    if not scraped:
+        return
+    now = datetime.now()
+    rows = [
+        (
+            company_key,
+            json.dumps([emails, linkedin_urls]),
+            (now + (CONTACT_CACHE_TTL if emails or linkedin_urls else CONTACT_CACHE_EMPTY_TTL)).isoformat(),
+        )
+        for company_key, (emails, linkedin_urls) in scraped.items()
+    ]
+    try:
+        conn = _contact_cache_connection()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO company_contacts (company_key, contacts, expires_at) VALUES (?, ?, ?)",
+                    rows,
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.debug("Contact cache write failed: %s", e)
+
+
 def enrich_jobs_with_contacts(jobs_needing_contacts):
     """
     Enrich jobs with recruiter contact data using a free multi-strategy scraper.
@@ -139,34 +259,44 @@ def enrich_jobs_with_contacts(jobs_needing_contacts):
         dict mapping job_id -> {poster_name, poster_email, poster_phone, poster_linkedin}
     """
     results = {}
-    company_cache = {}
 
+    # Strategy 1: Extract directly from the JD text (fastest, zero network calls).
+    # Jobs it finds nothing for queue their company (once, by first apply_url)
+    # for strategies 2 + 3.
+    jd_contacts = {}
+    to_scrape = {}
     for job in jobs_needing_contacts:
         company = job.get("company", "").strip()
         job_id = job.get("job_id", "")
         if not company or not job_id:
             continue
-
-        # Strategy 1: Extract directly from the JD text (fastest, zero network calls)
-        jd_text = job.get("job_description", "")
-        emails, linkedin_urls = extract_contacts_from_text(jd_text)
-
+        emails, linkedin_urls = extract_contacts_from_text(job.get("job_description", ""))
+        jd_contacts[job_id] = (emails, linkedin_urls)
         if not emails and not linkedin_urls:
-            # Strategy 2 + 3 — cache by company to avoid duplicate scrapes
-            cache_key = company.lower()
-            if cache_key not in company_cache:
-                apply_url = job.get("apply_url", "")
-                w_emails, w_linkedin = _try_company_website(company, apply_url)
-                time.sleep(1)  # polite delay between companies
-
-                g_emails, g_linkedin = [], []
-                if not w_emails and not w_linkedin:
-                    g_emails, g_linkedin = _google_search_contacts(company)
-                    time.sleep(2)  # slightly longer delay for Google
+            to_scrape.setdefault(company.lower(), (company, job.get("apply_url", "")))
+
+    # Strategy 2 + 3 — one scrape per company, several companies at a time,
+    # skipping companies scraped within the cache TTL
+    company_cache = _load_cached_contacts(list(to_scrape))
+    misses = {key: args for key, args in to_scrape.items() if key not in company_cache}
+    if misses:
+        with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(misses))) as executor:
+            scraped = dict(zip(
+                misses,
+                executor.map(lambda args: _scrape_company_contacts(*args), misses.values()),
+            ))
+        _store_cached_contacts(scraped)
+        company_cache.update(scraped)
 
-                company_cache[cache_key] = (w_emails + g_emails, w_linkedin + g_linkedin)
+    for job in jobs_needing_contacts:
+        company = job.get("company", "").strip()
+        job_id = job.get("job_id", "")
+        if not company or not job_id:
+            continue
 
-            emails, linkedin_urls = company_cache[cache_key]
+        emails, linkedin_urls = jd_contacts[job_id]
+        if not emails and not linkedin_urls:
+            emails, linkedin_urls = company_cache[company.lower()]
 
         if emails or linkedin_urls:
             results[job_id] = {
@@ -178,9 +308,10 @@ def enrich_jobs_with_contacts(jobs_needing_contacts):
             logger.info("Found contact for %s at %s: %s", company, job_id, emails[0] if emails else linkedin_urls[0])
 
     logger.info(
-        "Contact enrichment: %d/%d jobs got contacts (%d unique companies scraped)",
+        "Contact enrichment: %d/%d jobs got contacts (%d unique companies scraped, %d cached)",
         len(results),
         len(jobs_needing_contacts),
-        len(company_cache),
+        len(misses),
+        len(company_cache) - len(misses),
     )
     return results
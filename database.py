@@ -5,8 +5,14 @@ Handles creating tables, inserting/querying jobs, deduplication, and statistics.
 
 import sqlite3
 import os
+import re
+import copy
+import hashlib
+import json
 import logging
-from datetime import datetime, timedelta
+import threading
+from datetime import date, datetime, timedelta
+from functools import lru_cache, wraps
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +28,89 @@ def get_connection():
     """Get a SQLite connection with row factory enabled."""
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
+    # Per-connection settings. With WAL (set in init_db) NORMAL only syncs at
+    # checkpoints and is still crash-safe. Reads go through a memory map
+    # instead of read() copies, with a larger page cache for the long-lived
+    # thread connections, and sorts/temp b-trees stay in memory.
+    conn.executescript(
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA mmap_size=268435456;"
+        "PRAGMA cache_size=-20000;"
+    )
     return conn
 
 
+_thread_conns = threading.local()
+
+
+def get_thread_connection():
+    """
+    Get this thread's long-lived connection, for request-path reads.
+    Reusing it skips connection setup and keeps SQLite's statement cache
+    warm. Do not close it; commit any write made through it.
+    """
+    key = (os.getpid(), DB_PATH)
+    if getattr(_thread_conns, "key", None) != key:
+        # First use on this thread, or after a fork or a DB_PATH change
+        _thread_conns.conn = get_connection()
+        _thread_conns.key = key
+    return _thread_conns.conn
+
+
+# ---------------------------------------------------------------------------
+# Read-through cache for dashboard/filter aggregates
+# ---------------------------------------------------------------------------
+# PRAGMA data_version on a connection that never writes changes whenever any
+# other connection (this process, the scheduler, the CLI) commits, so cached
+# aggregates stay valid exactly until the next write. Keys also carry today's
+# date, since several aggregates bucket by "today".
+
+_aggregate_cache = {}
+_aggregate_cache_lock = threading.Lock()
+_version_conn = None
+_version_conn_key = None
+
+
+def _data_version():
+    """Return (pid, DB_PATH, data_version) for the current database state."""
+    global _version_conn, _version_conn_key
+    key = (os.getpid(), DB_PATH)
+    if _version_conn_key != key:
+        # Reopen after a fork or a DB_PATH change
+        _version_conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        _version_conn_key = key
+    return key + (_version_conn.execute("PRAGMA data_version").fetchone()[0],)
+
+
+def _cached_until_write(func):
+    """Cache an aggregate query's result until the database changes."""
+    @wraps(func)
+    def wrapper(*args):
+        with _aggregate_cache_lock:
+            key = (func.__name__, args, date.today(), _data_version())
+            if key in _aggregate_cache:
+                return copy.deepcopy(_aggregate_cache[key])
+        result = func(*args)
+        with _aggregate_cache_lock:
+            # Entries for older versions can never match again
+            for stale in [k for k in _aggregate_cache if k[0] == func.__name__ and k[1] == args]:
+                del _aggregate_cache[stale]
+            _aggregate_cache[key] = result
+        return copy.deepcopy(result)
+    return wrapper
+
+
+_jobs_fts_enabled = False
+
+
 def init_db():
     """Create the job_listings table if it doesn't exist."""
     conn = get_connection()
     cursor = conn.cursor()
+    # Persistent for the database file: readers no longer block the writer
+    # and commits append to the log instead of rewriting pages
+    cursor.execute("PRAGMA journal_mode=WAL")
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS job_listings (
             job_id TEXT PRIMARY KEY,
@@ -113,15 +195,126 @@ def init_db():
         except sqlite3.OperationalError:
             pass
 
+    # JD skill list cached by CV rescoring (JSON; see analyzer.attach_jd_skills)
+    for col in ["jd_skills TEXT"]:
+        try:
+            cursor.execute(f"ALTER TABLE job_listings ADD COLUMN {col}")
+        except sqlite3.OperationalError:
+            pass
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_jd_skills_reset
+        AFTER UPDATE OF role, job_description ON job_listings BEGIN
+            UPDATE job_listings SET jd_skills = NULL WHERE rowid = new.rowid;
+        END
+    """)
+
+    # Canonical city for the location filter, so it is an indexed equality
+    # lookup instead of an OR of LIKE scans
+    for col in ["location_canonical TEXT"]:
+        try:
+            cursor.execute(f"ALTER TABLE job_listings ADD COLUMN {col}")
+        except sqlite3.OperationalError:
+            pass
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_loc_canon ON job_listings(location_canonical)"
+    )
+    # Indexes for the jobs page's score filter and default sorts, and the
+    # recency filter on posting date
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_score_portal_app "
+        "ON job_listings(relevance_score DESC, portal, applied_status)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_date_found ON job_listings(date_found DESC)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_date_posted ON job_listings(date_posted) "
+        "WHERE date_posted IS NOT NULL AND date_posted != ''"
+    )
+    # Backfill rows stored before the column existed
+    rows = cursor.execute(
+        "SELECT rowid, location FROM job_listings WHERE location_canonical IS NULL"
+    ).fetchall()
+    if rows:
+        cursor.executemany(
+            "UPDATE job_listings SET location_canonical = ? WHERE rowid = ?",
+            [(normalize_location(r["location"]), r["rowid"]) for r in rows],
+        )
+
+    conn.commit()
+
+    # Give the planner row counts to choose between these indexes. Once the
+    # table has data, once is enough; the distribution doesn't shift much.
+    # (ANALYZE on an empty table records no index stats, so it runs again.)
+    analyzed = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone() is not None and cursor.execute(
+        "SELECT 1 FROM sqlite_stat1 WHERE idx = 'idx_jobs_score_portal_app'"
+    ).fetchone() is not None
+    if not analyzed:
+        cursor.execute("ANALYZE job_listings")
     conn.commit()
+
+    # Trigram full-text index for the jobs search box. A trigram phrase
+    # query is a case-insensitive substring match, the same as the
+    # LIKE '%term%' it replaces, but answered from the index instead of a
+    # scan over every description. Kept in sync by triggers.
+    global _jobs_fts_enabled
+    try:
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'"
+        ).fetchone() is not None
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+                role, company, job_description,
+                content='job_listings', content_rowid='rowid', tokenize='trigram'
+            )
+        """)
+        cursor.executescript("""
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON job_listings BEGIN
+                INSERT INTO jobs_fts(rowid, role, company, job_description)
+                VALUES (new.rowid, new.role, new.company, new.job_description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON job_listings BEGIN
+                INSERT INTO jobs_fts(jobs_fts, rowid, role, company, job_description)
+                VALUES ('delete', old.rowid, old.role, old.company, old.job_description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_au
+            AFTER UPDATE OF role, company, job_description ON job_listings BEGIN
+                INSERT INTO jobs_fts(jobs_fts, rowid, role, company, job_description)
+                VALUES ('delete', old.rowid, old.role, old.company, old.job_description);
+                INSERT INTO jobs_fts(rowid, role, company, job_description)
+                VALUES (new.rowid, new.role, new.company, new.job_description);
+            END;
+        """)
+        if not exists:
+            # Index the jobs stored before the FTS table existed
+            cursor.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+        conn.commit()
+        _jobs_fts_enabled = True
+    except sqlite3.OperationalError as e:
+        logger.warning("SQLite FTS5 trigram index unavailable, search will scan: %s", e)
+        _jobs_fts_enabled = False
+
     conn.close()
     logger.info("Database initialized at %s", DB_PATH)
 
 
+def jobs_fts_enabled():
+    """True once init_db() has created the jobs_fts search index."""
+    return _jobs_fts_enabled
+
+
 def generate_job_id(portal, company, role, location):
     """Generate a unique job ID from portal + company + role + location."""
-    import hashlib
     raw = f"{portal}:{company}:{role}:{location}".lower().strip()
+    return _job_id_hash(raw)
+
+
+@lru_cache(maxsize=16384)
+def _job_id_hash(raw):
+    # Memoized: scheduled runs keep re-scraping the same listings. The hash
+    # itself must not change, stored job_ids depend on it.
     return hashlib.sha256(raw.encode()).hexdigest()[:16]
 
 
@@ -170,50 +363,10 @@ def insert_job(job):
         )
         return False
 
-    # Normalize location at insert time
-    raw_location = job.get("location")
-    normalized_loc = normalize_location(raw_location) if raw_location else raw_location
-
     conn = get_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute(
-            """
-            INSERT INTO job_listings
-                (job_id, portal, company, role, salary, salary_currency, location,
-                 job_description, apply_url, relevance_score, remote_status,
-                 company_type, date_found, date_posted, applied_status,
-                 experience_min, experience_max, salary_min, salary_max,
-                 company_size, company_funding_stage, company_glassdoor_rating,
-                 cv_score)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0,
-                    ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                job_id,
-                job.get("portal", "unknown"),
-                job["company"],
-                job["role"],
-                job.get("salary"),
-                job.get("salary_currency", "INR"),
-                normalized_loc,
-                job.get("job_description"),
-                job.get("apply_url"),
-                job.get("relevance_score", 0),
-                job.get("remote_status", "on-site"),
-                job.get("company_type", "corporate"),
-                datetime.now().isoformat(),
-                job.get("date_posted"),
-                job.get("experience_min"),
-                job.get("experience_max"),
-                job.get("salary_min"),
-                job.get("salary_max"),
-                job.get("company_size"),
-                job.get("company_funding_stage"),
-                job.get("company_glassdoor_rating"),
-                job.get("cv_score", 0),
-            ),
-        )
+        _insert_job_row(cursor, job, job_id)
         conn.commit()
         logger.debug("Inserted job %s: %s at %s", job_id, job["role"], job["company"])
         return True
@@ -224,15 +377,132 @@ def insert_job(job):
         conn.close()
 
 
+_INSERT_JOB_SQL = """
+    INSERT INTO job_listings
+        (job_id, portal, company, role, salary, salary_currency, location,
+         job_description, apply_url, relevance_score, remote_status,
+         company_type, date_found, date_posted, applied_status,
+         experience_min, experience_max, salary_min, salary_max,
+         company_size, company_funding_stage, company_glassdoor_rating,
+         cv_score, location_canonical)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0,
+            ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _job_row_values(job, job_id):
+    """Parameters for _INSERT_JOB_SQL."""
+    # Normalize location at insert time
+    raw_location = job.get("location")
+    normalized_loc = normalize_location(raw_location) if raw_location else raw_location
+
+    return (
+        job_id,
+        job.get("portal", "unknown"),
+        job["company"],
+        job["role"],
+        job.get("salary"),
+        job.get("salary_currency", "INR"),
+        normalized_loc,
+        job.get("job_description"),
+        job.get("apply_url"),
+        job.get("relevance_score", 0),
+        job.get("remote_status", "on-site"),
+        job.get("company_type", "corporate"),
+        datetime.now().isoformat(),
+        job.get("date_posted"),
+        job.get("experience_min"),
+        job.get("experience_max"),
+        job.get("salary_min"),
+        job.get("salary_max"),
+        job.get("company_size"),
+        job.get("company_funding_stage"),
+        job.get("company_glassdoor_rating"),
+        job.get("cv_score", 0),
+        normalize_location(normalized_loc),
+    )
+
+
+def _insert_job_row(cursor, job, job_id):
+    """INSERT one job row; the caller commits. Raises IntegrityError on duplicates."""
+    cursor.execute(_INSERT_JOB_SQL, _job_row_values(job, job_id))
+
+
+# find_similar_job() compares against this many of the most recent jobs
+_SIMILAR_JOB_WINDOW = 2000
+
+
 def insert_jobs_bulk(jobs):
-    """Insert multiple jobs, returning counts of inserted and skipped."""
-    inserted = 0
+    """
+    Insert multiple jobs, returning counts of inserted and skipped. Applies
+    the same exact and cross-portal duplicate checks as insert_job(), but in
+    one connection and one transaction, reading the recent jobs for the
+    fuzzy check once instead of once per job.
+    """
+    from scrapers import _normalize_company_name, _fuzzy_role_match
+
     skipped = 0
-    for job in jobs:
-        if insert_job(job):
-            inserted += 1
-        else:
-            skipped += 1
+    rows = []
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        # Take the write lock up front so the duplicate checks below stay
+        # true until the rows are written
+        cursor.execute("BEGIN IMMEDIATE")
+        job_ids = [
+            job.get("job_id") or generate_job_id(
+                job["portal"], job["company"], job["role"], job.get("location", "")
+            )
+            for job in jobs
+        ]
+        cursor.execute(
+            "SELECT job_id FROM job_listings WHERE job_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(job_ids),),
+        )
+        # Also collects this batch's ids, so a repeat within it is skipped
+        seen_ids = {r["job_id"] for r in cursor.fetchall()}
+
+        cursor.execute(
+            "SELECT company, role FROM job_listings ORDER BY date_found DESC LIMIT ?",
+            (_SIMILAR_JOB_WINDOW,),
+        )
+        # normalized company -> [(role, rank)], rank 0 = most recent row.
+        # Rows this batch inserts get ranks -1, -2, ... (newer than anything
+        # else), so after n inserts a row's position is rank + n and only
+        # positions inside the window count, exactly as repeated insert_job()
+        # calls would see it.
+        recent = {}
+        for rank, r in enumerate(cursor.fetchall()):
+            recent.setdefault(_normalize_company_name(r["company"]), []).append((r["role"], rank))
+
+        for job, job_id in zip(jobs, job_ids):
+            if job_id in seen_ids:
+                logger.debug("Job %s already exists, skipping insert", job_id)
+                skipped += 1
+                continue
+
+            norm_company = _normalize_company_name(job["company"])
+            inserted = len(rows)
+            if any(
+                rank + inserted < _SIMILAR_JOB_WINDOW and _fuzzy_role_match(job["role"], role)
+                for role, rank in recent.get(norm_company, ())
+            ):
+                logger.debug(
+                    "Cross-portal duplicate detected: '%s' at '%s'",
+                    job["role"], job["company"],
+                )
+                skipped += 1
+                continue
+
+            rows.append(_job_row_values(job, job_id))
+            seen_ids.add(job_id)
+            recent.setdefault(norm_company, []).append((job["role"], -1 - inserted))
+
+        cursor.executemany(_INSERT_JOB_SQL, rows)
+        conn.commit()
+    finally:
+        conn.close()
+    inserted = len(rows)
     return inserted, skipped
 
 
@@ -380,6 +650,7 @@ def get_top_roles(limit=5):
     return [(r["role"], r["cnt"]) for r in rows]
 
 
+@_cached_until_write
 def get_comprehensive_stats():
     """Return a full stats dictionary for display."""
     return {
@@ -395,6 +666,7 @@ def get_comprehensive_stats():
     }
 
 
+@_cached_until_write
 def get_application_pipeline_stats():
     """Get counts for each application stage."""
     labels = {
@@ -415,6 +687,7 @@ def get_application_pipeline_stats():
     return result
 
 
+@_cached_until_write
 def get_best_matching_categories(limit=5):
     """Get role categories with highest average relevance scores."""
     conn = get_connection()
@@ -444,6 +717,7 @@ def get_best_matching_categories(limit=5):
     return [dict(r) for r in rows]
 
 
+@_cached_until_write
 def get_application_activity(days=30):
     """Get daily application counts for the last N days."""
     conn = get_connection()
@@ -463,6 +737,7 @@ def get_application_activity(days=30):
     return [dict(r) for r in rows]
 
 
+@_cached_until_write
 def get_recommended_actions():
     """Generate recommended next actions based on current data."""
     actions = []
@@ -532,7 +807,8 @@ def find_similar_job(company, role, location):
     cursor = conn.cursor()
     # Fetch recent jobs to check against (limit scope for performance)
     cursor.execute(
-        "SELECT job_id, company, role, location FROM job_listings ORDER BY date_found DESC LIMIT 2000"
+        "SELECT job_id, company, role, location FROM job_listings ORDER BY date_found DESC LIMIT ?",
+        (_SIMILAR_JOB_WINDOW,),
     )
     rows = cursor.fetchall()
     conn.close()
@@ -574,6 +850,7 @@ def get_saved_count():
     return count
 
 
+@_cached_until_write
 def get_portal_quality_stats():
     """Get average relevance score per portal - shows which portal returns best jobs."""
     conn = get_connection()
@@ -607,6 +884,31 @@ def update_job_contacts(job_id, poster_name, poster_email, poster_phone, poster_
     conn.close()
 
 
+def update_job_contacts_bulk(contacts):
+    """
+    Update contact enrichment fields for many jobs in one transaction.
+    contacts: dict of job_id -> {poster_name, poster_email, poster_phone, poster_linkedin}
+    """
+    conn = get_connection()
+    conn.executemany(
+        """UPDATE job_listings
+           SET poster_name = ?, poster_email = ?, poster_phone = ?, poster_linkedin = ?
+           WHERE job_id = ?""",
+        [
+            (
+                info.get("poster_name", ""),
+                info.get("poster_email", ""),
+                info.get("poster_phone", ""),
+                info.get("poster_linkedin", ""),
+                job_id,
+            )
+            for job_id, info in contacts.items()
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
 def dedup_jobs():
     """
     Remove cross-portal / cross-session duplicates from the database.
@@ -638,14 +940,13 @@ def dedup_jobs():
 
     deleted = 0
     if to_delete:
-        chunk_size = 500
-        for i in range(0, len(to_delete), chunk_size):
-            batch = to_delete[i : i + chunk_size]
-            placeholders = ",".join("?" for _ in batch)
-            cursor.execute(
-                f"DELETE FROM job_listings WHERE job_id IN ({placeholders})", batch
-            )
-            deleted += cursor.rowcount
+        # A single JSON array parameter is not subject to SQLite's
+        # bound-parameter limit, so no chunking is needed
+        cursor.execute(
+            "DELETE FROM job_listings WHERE job_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(to_delete),),
+        )
+        deleted = cursor.rowcount
         conn.commit()
 
     conn.close()
@@ -677,6 +978,17 @@ def update_job_notes(job_id, notes):
     conn.close()
 
 
+@_cached_until_write
+def get_distinct_portals():
+    """Get sorted list of distinct portals, for the jobs filter dropdown."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT DISTINCT portal FROM job_listings ORDER BY portal")
+    rows = cursor.fetchall()
+    conn.close()
+    return [r["portal"] for r in rows]
+
+
 def get_distinct_locations():
     """Get sorted list of distinct non-null locations from job listings."""
     conn = get_connection()
@@ -738,6 +1050,15 @@ _INTERNATIONAL_KEYWORDS = [
 ]
 
 
+# One alternation per city, tried in _CITY_PATTERNS order, so the first city
+# with any matching pattern still wins
+_CITY_REGEXES = [
+    (canonical, re.compile("|".join(re.escape(p) for p in patterns)))
+    for canonical, patterns in _CITY_PATTERNS.items()
+]
+
+
+@lru_cache(maxsize=4096)
 def normalize_location(raw_location):
     """
     Normalize a raw location string to a canonical city name.
@@ -746,13 +1067,13 @@ def normalize_location(raw_location):
     if not raw_location:
         return ""
     raw_lower = raw_location.lower()
-    for canonical, patterns in _CITY_PATTERNS.items():
-        for pattern in patterns:
-            if pattern in raw_lower:
-                return canonical
+    for canonical, regex in _CITY_REGEXES:
+        if regex.search(raw_lower):
+            return canonical
     return raw_location
 
 
+@_cached_until_write
 def get_normalized_locations():
     """
     Get sorted list of canonical (normalized) location names
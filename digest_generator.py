@@ -221,8 +221,13 @@ def generate_html_digest(jobs, portal_results, preferences, stats):
 </body>
 </html>"""
 
-    with open(filepath, "w", encoding="utf-8") as f:
+    # Write then rename: a rerun on the same day replaces the file in one
+    # step, and the rename updates the directory mtime the /digests listing
+    # cache keys on
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
         f.write(html)
+    os.replace(tmp_path, filepath)
 
     logger.info("HTML digest saved to %s", filepath)
     return filepath
@@ -14,10 +14,12 @@ Usage:
 """
 
 import argparse
+import copy
 import json
 import logging
 import os
 import sys
+import threading
 import webbrowser
 from datetime import datetime
 from logging.handlers import TimedRotatingFileHandler
@@ -102,7 +104,7 @@ def load_config():
     return {
         "portals": {},
         "scraping": {"thread_count": 4, "request_delay_min": 2, "request_delay_max": 5, "max_retries": 3, "portal_timeout": 30, "cache_expiry_hours": 12},
-        "scoring": {"min_relevance_score": 65, "ollama_model": "mistral", "ollama_timeout": 60, "use_ollama": True},
+        "scoring": {"min_relevance_score": 65, "ollama_model": "mistral", "ollama_timeout": 60, "ollama_concurrency": 4, "ollama_batch_size": 1, "llm_uncertainty_band": None, "cheap_reject": False, "keyword_processes": 0, "use_ollama": True},
         "digest": {"open_in_browser": True, "keep_days": 90},
         "logging": {"log_file": "job_agent.log", "max_log_days": 30, "log_level": "INFO"},
     }
@@ -157,6 +159,9 @@ def save_preferences(prefs):
             clean.pop(pref_key, None)
     with open(PREFS_PATH, "w") as f:
         json.dump(clean, f, indent=2)
+    # mtime resolution can be coarse; don't rely on it for our own writes
+    with _file_cache_lock:
+        _file_cache.pop(PREFS_PATH, None)
 
 
 def apply_env_overrides(prefs):
@@ -184,6 +189,40 @@ def apply_env_overrides(prefs):
     return prefs
 
 
+# Parsed config/preferences keyed by path, reused until the file's mtime changes
+_file_cache = {}
+_file_cache_lock = threading.Lock()
+
+
+def _load_cached(path, loader):
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None
+    with _file_cache_lock:
+        hit = _file_cache.get(path)
+        if hit is not None and hit[0] == mtime:
+            return copy.deepcopy(hit[1])
+    value = loader()
+    with _file_cache_lock:
+        _file_cache[path] = (mtime, value)
+    return copy.deepcopy(value)
+
+
+def cached_config():
+    """load_config(), re-read only when config.json changes."""
+    return _load_cached(CONFIG_PATH, load_config)
+
+
+def cached_prefs():
+    """
+    Preferences with env overrides applied, as every caller builds them.
+    The JSON file is re-read only when it changes; env vars are applied fresh.
+    """
+    prefs = _load_cached(PREFS_PATH, load_preferences)
+    return apply_env_overrides(prefs or copy.deepcopy(DEFAULT_PREFS))
+
+
 def interactive_setup():
     """
     Run first-time interactive setup or edit preferences.
@@ -31,7 +31,7 @@ except ImportError:
 import requests
 from main import load_config, load_preferences, DEFAULT_PREFS, apply_env_overrides
 from scrapers import scrape_all_portals
-from analyzer import analyze_jobs
+from analyzer import iter_analyzed_jobs
 from database import generate_job_id
 
 logging.basicConfig(
@@ -40,6 +40,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Job fields sent to /api/jobs/import
+_SERIALIZABLE_FIELDS = [
+    "job_id", "portal", "company", "role", "salary", "salary_currency",
+    "location", "job_description", "apply_url", "relevance_score",
+    "remote_status", "company_type", "date_posted",
+    "experience_min", "experience_max", "salary_min", "salary_max",
+    "company_size", "company_funding_stage", "company_glassdoor_rating",
+]
+
+
+def _push_batch(endpoint, import_secret, batch, batch_num):
+    """POST one batch of jobs to the import API; exits the run if it fails."""
+    try:
+        resp = requests.post(
+            endpoint,
+            json={"secret": import_secret, "jobs": batch},
+            timeout=120,
+        )
+        resp.raise_for_status()
+        result = resp.json()
+        logger.info(
+            "  Batch %d: inserted=%s, skipped=%s",
+            batch_num, result.get("inserted"), result.get("skipped"),
+        )
+        return result
+    except requests.RequestException as e:
+        logger.error("Batch %d failed: %s", batch_num, e)
+        if hasattr(e, "response") and e.response is not None:
+            logger.error("Response body: %s", e.response.text[:500])
+        sys.exit(1)
+
 
 def main():
     render_url = os.environ.get("RENDER_APP_URL", "").rstrip("/")
@@ -70,71 +101,49 @@ def main():
 
     logger.info("Total raw jobs scraped: %d", len(all_jobs))
 
-    # --- Phase 2: Analyze ---
-    logger.info("Analyzing and scoring jobs...")
-    qualified_jobs, all_analyzed = analyze_jobs(all_jobs, preferences, config)
-    logger.info("Analyzed %d jobs, %d qualified (score >= threshold)", len(all_analyzed), len(qualified_jobs))
+    # --- Phase 2-4: Analyze, generate IDs and push ---
+    # Jobs stream out of iter_analyzed_jobs, so each batch is pushed as soon
+    # as it is scored and only one batch of payload dicts exists at a time.
+    # Batches stay small because the Render free tier can't handle 1000+
+    # jobs at once.
+    logger.info("Analyzing, scoring and pushing jobs...")
+    min_score = config.get("scoring", {}).get("min_relevance_score", 65)
+    endpoint = f"{render_url}/api/jobs/import"
+    batch_size = 100
+    total_batches = (len(all_jobs) + batch_size - 1) // batch_size
+    qualified_count = 0
+    total_inserted = 0
+    total_skipped = 0
+    total_alerts = 0
 
-    # --- Phase 3: Generate IDs ---
-    for job in all_analyzed:
+    batch = []
+    for i, job in enumerate(iter_analyzed_jobs(all_jobs, preferences, config)):
         job["job_id"] = generate_job_id(
             job.get("portal", "unknown"),
             job.get("company", ""),
             job.get("role", ""),
             job.get("location", ""),
         )
+        if job["relevance_score"] >= min_score:
+            qualified_count += 1
 
-    # --- Phase 4: Push to Render ---
-    # Serialize jobs for JSON transport (strip non-serializable fields)
-    serializable_fields = [
-        "job_id", "portal", "company", "role", "salary", "salary_currency",
-        "location", "job_description", "apply_url", "relevance_score",
-        "remote_status", "company_type", "date_posted",
-        "experience_min", "experience_max", "salary_min", "salary_max",
-        "company_size", "company_funding_stage", "company_glassdoor_rating",
-    ]
-    payload_jobs = []
-    for job in all_analyzed:
-        clean = {}
-        for key in serializable_fields:
-            if key in job and job[key] is not None:
-                clean[key] = job[key]
-        payload_jobs.append(clean)
-
-    # --- Push in batches (Render free tier can't handle 1000+ jobs at once) ---
-    endpoint = f"{render_url}/api/jobs/import"
-    batch_size = 100
-    total_inserted = 0
-    total_skipped = 0
-    total_alerts = 0
+        # Serialize for JSON transport (strip non-serializable fields)
+        batch.append({
+            key: job[key] for key in _SERIALIZABLE_FIELDS
+            if key in job and job[key] is not None
+        })
+        if len(batch) < batch_size and i + 1 < len(all_jobs):
+            continue
 
-    for i in range(0, len(payload_jobs), batch_size):
-        batch = payload_jobs[i:i + batch_size]
         batch_num = i // batch_size + 1
-        total_batches = (len(payload_jobs) + batch_size - 1) // batch_size
         logger.info("Pushing batch %d/%d (%d jobs)...", batch_num, total_batches, len(batch))
+        result = _push_batch(endpoint, import_secret, batch, batch_num)
+        total_inserted += result.get("inserted", 0)
+        total_skipped += result.get("skipped", 0)
+        total_alerts += result.get("alerts", 0)
+        batch = []
 
-        try:
-            resp = requests.post(
-                endpoint,
-                json={"secret": import_secret, "jobs": batch},
-                timeout=120,
-            )
-            resp.raise_for_status()
-            result = resp.json()
-            total_inserted += result.get("inserted", 0)
-            total_skipped += result.get("skipped", 0)
-            total_alerts += result.get("alerts", 0)
-            logger.info(
-                "  Batch %d: inserted=%s, skipped=%s",
-                batch_num, result.get("inserted"), result.get("skipped"),
-            )
-        except requests.RequestException as e:
-            logger.error("Batch %d failed: %s", batch_num, e)
-            if hasattr(e, "response") and e.response is not None:
-                logger.error("Response body: %s", e.response.text[:500])
-            sys.exit(1)
-
+    logger.info("Analyzed %d jobs, %d qualified (score >= threshold)", len(all_jobs), qualified_count)
     logger.info(
         "All batches complete: inserted=%d, skipped=%d, alerts=%d",
         total_inserted, total_skipped, total_alerts,
@@ -1259,12 +1259,16 @@ def scrape_all_portals(job_titles, locations, config, progress_callback=None):
             logger.error("Portal %s failed: %s", portal_name, e)
             return portal_name, [], "failed", elapsed
 
-    # Run health checks first
+    # Run health checks first; they are independent HEAD requests, so check
+    # every portal at once instead of waiting out each timeout in turn
     logger.info("Running portal health checks...")
-    for portal_name in enabled_portals:
-        base_url = config["portals"][portal_name].get("base_url", "")
-        if base_url:
-            check_portal_health(portal_name, base_url, config)
+    health_targets = [
+        (name, config["portals"][name].get("base_url", "")) for name in enabled_portals
+    ]
+    health_targets = [(name, url) for name, url in health_targets if url]
+    if health_targets:
+        with ThreadPoolExecutor(max_workers=len(health_targets)) as executor:
+            list(executor.map(lambda t: check_portal_health(t[0], t[1], config), health_targets))
 
     logger.info("Starting scraping from %d portals with %d threads", total, thread_count)
 
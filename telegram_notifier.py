@@ -3,11 +3,26 @@ telegram_notifier.py - Send job alerts to Telegram via Bot API.
 Uses requests.post to the Telegram sendMessage endpoint.
 """
 
+import atexit
 import logging
+import queue
+import threading
+import time
+
 import requests
 
 logger = logging.getLogger(__name__)
 
+# Reused so consecutive alerts share one keep-alive connection to the API
+_SESSION = requests.Session()
+
+# Alerts queued by the scraping pipelines, sent in order by one daemon thread
+_send_queue = queue.Queue()
+_sender_thread = None
+_sender_lock = threading.Lock()
+# At interpreter exit, wait at most this many seconds for queued alerts
+_EXIT_DRAIN_TIMEOUT = 15
+
 
 def _score_emoji(score):
     """Return an emoji circle based on relevance score."""
@@ -18,14 +33,8 @@ def _score_emoji(score):
     return "\U0001f7e0"      # orange circle
 
 
-def send_telegram_alert(job, bot_token, chat_id):
-    """
-    Send a single job as a formatted HTML message to a Telegram chat.
-    job: dict with keys like role, company, location, relevance_score, etc.
-    """
-    if not bot_token or not chat_id:
-        return
-
+def _format_job_alert(job):
+    """Build the HTML alert text for one job."""
     score = job.get("relevance_score", 0)
     emoji = _score_emoji(score)
 
@@ -54,10 +63,13 @@ def send_telegram_alert(job, bot_token, chat_id):
     if apply_url:
         lines.append(f'\n<a href="{apply_url}">Apply</a>')
 
-    text = "\n".join(lines)
+    return "\n".join(lines)
+
 
+def _post_alert_text(text, bot_token, chat_id):
+    """POST one alert message; returns True if Telegram accepted it."""
     try:
-        resp = requests.post(
+        resp = _SESSION.post(
             f"https://api.telegram.org/bot{bot_token}/sendMessage",
             json={
                 "chat_id": chat_id,
@@ -69,11 +81,60 @@ def send_telegram_alert(job, bot_token, chat_id):
         )
         data = resp.json()
         if data.get("ok"):
-            logger.info("Telegram alert sent: %s at %s", job.get("role"), job.get("company"))
-        else:
-            logger.warning("Telegram API error: %s", data.get("description", resp.text[:200]))
+            return True
+        logger.warning("Telegram API error: %s", data.get("description", resp.text[:200]))
     except requests.RequestException as e:
         logger.error("Telegram alert failed: %s", e)
+    return False
+
+
+def send_telegram_alert(job, bot_token, chat_id):
+    """
+    Send a single job as a formatted HTML message to a Telegram chat.
+    job: dict with keys like role, company, location, relevance_score, etc.
+    """
+    if not bot_token or not chat_id:
+        return
+
+    if _post_alert_text(_format_job_alert(job), bot_token, chat_id):
+        logger.info("Telegram alert sent: %s at %s", job.get("role"), job.get("company"))
+
+
+# Telegram rejects messages over 4096 characters
+_MAX_MESSAGE_CHARS = 4096
+_ALERTS_PER_MESSAGE = 10
+_ALERT_SEPARATOR = "\n\n"
+
+
+def send_telegram_alerts_batch(jobs, bot_token, chat_id):
+    """
+    Send job alerts grouped up to 10 per message instead of one message
+    per job. Returns the number of jobs in messages Telegram accepted.
+    """
+    if not bot_token or not chat_id:
+        return 0
+
+    messages = []
+    current, current_len = [], 0
+    for job in jobs:
+        text = _format_job_alert(job)[:_MAX_MESSAGE_CHARS]
+        extra = len(text) + (len(_ALERT_SEPARATOR) if current else 0)
+        if current and (len(current) >= _ALERTS_PER_MESSAGE
+                        or current_len + extra > _MAX_MESSAGE_CHARS):
+            messages.append(current)
+            current, current_len = [], 0
+            extra = len(text)
+        current.append(text)
+        current_len += extra
+    if current:
+        messages.append(current)
+
+    sent = 0
+    for texts in messages:
+        if _post_alert_text(_ALERT_SEPARATOR.join(texts), bot_token, chat_id):
+            sent += len(texts)
+    logger.info("Telegram alerts sent: %d of %d in %d messages", sent, len(jobs), len(messages))
+    return sent
 
 
 def send_telegram_batch_summary(total_found, qualified_count, inserted_count, bot_token, chat_id):
@@ -89,7 +150,7 @@ def send_telegram_batch_summary(total_found, qualified_count, inserted_count, bo
     )
 
     try:
-        resp = requests.post(
+        resp = _SESSION.post(
             f"https://api.telegram.org/bot{bot_token}/sendMessage",
             json={
                 "chat_id": chat_id,
@@ -103,3 +164,66 @@ def send_telegram_batch_summary(total_found, qualified_count, inserted_count, bo
             logger.warning("Telegram summary error: %s", data.get("description"))
     except requests.RequestException as e:
         logger.error("Telegram summary failed: %s", e)
+
+
+def _drain_send_queue():
+    while True:
+        send, args = _send_queue.get()
+        try:
+            send(*args)
+        except Exception:
+            logger.exception("Queued Telegram message failed")
+        finally:
+            _send_queue.task_done()
+
+
+def _drain_at_exit(timeout=_EXIT_DRAIN_TIMEOUT):
+    """
+    Give the daemon sender up to timeout seconds to flush the queue before
+    the interpreter exits (end of a CLI run, worker restart, redeploy), and
+    log what is still unsent after that.
+    """
+    deadline = time.monotonic() + timeout
+    while (
+        _send_queue.unfinished_tasks
+        and _sender_thread is not None and _sender_thread.is_alive()
+        and time.monotonic() < deadline
+    ):
+        time.sleep(0.1)
+    with _send_queue.mutex:
+        pending = list(_send_queue.queue)
+    if pending:
+        dropped = sum(
+            len(args[0]) if send is send_telegram_alerts_batch else 1
+            for send, args in pending
+        )
+        logger.warning("Exiting with %d Telegram message(s) unsent", dropped)
+
+
+atexit.register(_drain_at_exit)
+
+
+def _enqueue(send, *args):
+    global _sender_thread
+    with _sender_lock:
+        # Also restarts the sender in a forked worker, where the thread is gone
+        if _sender_thread is None or not _sender_thread.is_alive():
+            _sender_thread = threading.Thread(
+                target=_drain_send_queue, name="telegram-sender", daemon=True
+            )
+            _sender_thread.start()
+    _send_queue.put((send, args))
+
+
+def queue_telegram_alerts_batch(jobs, bot_token, chat_id):
+    """Like send_telegram_alerts_batch(), but sent from the background thread; returns at once."""
+    if not bot_token or not chat_id or not jobs:
+        return
+    _enqueue(send_telegram_alerts_batch, [dict(j) for j in jobs], bot_token, chat_id)
+
+
+def queue_telegram_batch_summary(total_found, qualified_count, inserted_count, bot_token, chat_id):
+    """Queue the run summary behind any alerts already queued."""
+    if not bot_token or not chat_id:
+        return
+    _enqueue(send_telegram_batch_summary, total_found, qualified_count, inserted_count, bot_token, chat_id)
@@ -3,7 +3,11 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from analyzer import parse_cv_text, cv_score, compute_gap_analysis
+from analyzer import (
+    parse_cv_text, cv_score, cv_scores, compute_gap_analysis, keyword_score,
+    extract_experience_years, _extract_json,
+)
+import analyzer
 
 
 SAMPLE_CV = """
@@ -62,6 +66,13 @@ def test_cv_score_higher_when_more_skills_match():
     assert rich_score > poor_score
 
 
+def test_cv_scores_matches_cv_score_per_job():
+    cv_data = parse_cv_text(SAMPLE_CV)
+    jobs = [SAMPLE_JD_JOB, {"role": "Chef", "job_description": "Cooking and plating dishes"}]
+    assert cv_scores(jobs, cv_data) == [cv_score(job, cv_data) for job in jobs]
+    assert cv_scores(jobs, None) == [0, 0]
+
+
 def test_compute_gap_analysis_structure():
     cv_data = parse_cv_text(SAMPLE_CV)
     result = compute_gap_analysis(SAMPLE_JD_JOB, cv_data)
@@ -79,3 +90,169 @@ def test_compute_gap_analysis_no_cv():
     result = compute_gap_analysis(SAMPLE_JD_JOB, None)
     assert result["cv_score"] == 0
     assert "Upload your CV" in result["action_steps"][0]
+
+
+PM_PREFS = {
+    "job_titles": ["Product Manager"],
+    "locations": ["Bangalore"],
+    "transferable_skills": ["Stakeholder Management"],
+}
+
+
+def test_keyword_score_rewards_pm_fintech_job():
+    job = {
+        "role": "Product Manager",
+        "company": "PayCo",
+        "job_description": "Fintech payments startup. Remote friendly. Stakeholder management and ownership.",
+        "location": "Bangalore",
+    }
+    # title 30 + location 10 + remote 10 + industry 20 + pm 20 + growth 5 + transferable 5
+    assert keyword_score(job, PM_PREFS) == 100
+
+
+def test_keyword_score_irrelevant_domain_scores_zero():
+    job = {
+        "role": "Product Manager",
+        "company": "BuildCo",
+        "job_description": "Construction materials, fintech exposure a plus.",
+        "location": "Bangalore",
+    }
+    assert keyword_score(job, PM_PREFS) == 0
+
+
+def test_keyword_score_cheap_reject_skips_off_target_roles():
+    job = {
+        "role": "Sales Executive",
+        "company": "RetailCo",
+        "job_description": "Remote role with ownership and stakeholder management.",
+        "location": "Bangalore",
+    }
+    assert keyword_score(job, PM_PREFS) > 0
+    assert keyword_score(job, PM_PREFS, cheap_reject=True) == 0
+
+
+def test_extract_json_handles_nested_braces_and_prose():
+    content = 'Sure! {note} {"score": 80, "reason": "uses {braces} inside"} done'
+    assert _extract_json(content) == {"score": 80, "reason": "uses {braces} inside"}
+    assert _extract_json('Points: ["a", "b"]', "[") == ["a", "b"]
+    assert _extract_json("no json here") is None
+
+
+def test_extract_experience_years_range_separators():
+    assert extract_experience_years("5-10 years of experience") == (5, 10)
+    assert extract_experience_years("3 to 6 yrs in product") == (3, 6)
+    # Stray letters are not a range separator
+    assert extract_experience_years("5oo10 years") == (10, 15)
+
+
+def test_score_cache_round_trip_and_expiry(tmp_path, monkeypatch):
+    monkeypatch.setattr(analyzer, "SCORE_CACHE_PATH", str(tmp_path / "cache.db"))
+    key = analyzer._score_cache_key("mistral", "prompt")
+    assert analyzer._get_cached_score(key) is None
+    analyzer._set_cached_score(key, {"score": 70})
+    assert analyzer._get_cached_score(key) == {"score": 70}
+    monkeypatch.setattr(analyzer, "SCORE_CACHE_MAX_AGE", analyzer.timedelta(0))
+    assert analyzer._get_cached_score(key) is None
+
+
+def test_corrupt_score_cache_row_is_a_miss(tmp_path, monkeypatch):
+    monkeypatch.setattr(analyzer, "SCORE_CACHE_PATH", str(tmp_path / "cache.db"))
+    key = analyzer._score_cache_key("mistral", "prompt")
+    analyzer._set_cached_score(key, {"score": 70})
+    conn = analyzer._score_cache_connection()
+    with conn:
+        conn.execute("UPDATE ollama_scores SET result = ? WHERE cache_key = ?", ("{not json", key))
+    assert analyzer._get_cached_score(key) is None
+
+
+def test_ollama_model_check_is_cached(monkeypatch):
+    monkeypatch.setattr(analyzer, "_model_check_cache", {})
+    calls = []
+
+    class FakeClient:
+        def list(self):
+            calls.append(1)
+            if len(calls) > 1:
+                raise ConnectionError("server went away")
+            model = type("M", (), {"model": "mistral:latest"})()
+            return type("R", (), {"models": [model]})()
+
+    client = FakeClient()
+    assert analyzer._ollama_model_available(client, "mistral")
+    assert analyzer._ollama_model_available(client, "mistral")
+    assert len(calls) == 1
+    # An expired entry is re-checked, but a failing check keeps the last answer
+    monkeypatch.setattr(analyzer, "_MODEL_CHECK_TTL", 0)
+    assert analyzer._ollama_model_available(client, "mistral")
+    assert len(calls) == 2
+
+
+def test_validated_score_clamps_and_rejects_bad_scores():
+    assert analyzer._validated_score({"score": 140, "reason": "x"}) == {"score": 100, "reason": "x"}
+    assert analyzer._validated_score({"score": "72"}) == {"score": 72}
+    assert analyzer._validated_score({"score": "high"}) is None
+    assert analyzer._validated_score({"reason": "no score"}) is None
+    assert analyzer._validated_score(None) is None
+
+
+def test_tailored_points_are_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(analyzer, "SCORE_CACHE_PATH", str(tmp_path / "cache.db"))
+    calls = []
+
+    class FakeClient:
+        def chat(self, **kwargs):
+            calls.append(1)
+            return {"message": {"content": '["Point one", "Point two"]'}}
+
+    monkeypatch.setattr(analyzer, "_ollama_client", lambda timeout: FakeClient())
+    job = {"role": "Product Manager", "company": "Acme", "job_description": "SQL and roadmaps"}
+    prefs = {"transferable_skills": ["Data Analysis"]}
+    first = analyzer.generate_tailored_points(job, prefs, {})
+    assert first == ["Point one", "Point two"]
+    assert analyzer.generate_tailored_points(job, prefs, {}) == first
+    assert len(calls) == 1
+
+
+def test_load_cv_data_is_reused_until_saved(tmp_path, monkeypatch):
+    monkeypatch.setattr(analyzer, "CV_DATA_PATH", str(tmp_path / "cv_data.json"))
+    assert analyzer.load_cv_data() is None
+    analyzer.save_cv_data({"skills": ["SQL"], "raw_text": "sql"})
+    first = analyzer.load_cv_data()
+    first["skills"].append("Mutated")
+    assert analyzer.load_cv_data() == {"skills": ["SQL"], "raw_text": "sql"}
+    analyzer.save_cv_data({"skills": ["Python"], "raw_text": "python"})
+    assert analyzer.load_cv_data()["skills"] == ["Python"]
+
+
+def test_attach_jd_skills_reuses_current_and_refreshes_stale():
+    jobs = [
+        {"job_id": "a", "role": "Data Analyst", "job_description": "SQL, Python and Tableau"},
+        {"job_id": "b", "role": "PM", "job_description": "Roadmap", "jd_skills": '{"vocab": "old", "skills": []}'},
+    ]
+    expected = analyzer.cv_scores([dict(j, jd_skills=None) for j in jobs], {"skills": ["SQL"], "raw_text": "sql"})
+    stale = analyzer.attach_jd_skills(jobs)
+    assert [job_id for _, job_id in stale] == ["a", "b"]
+    assert analyzer.cv_scores(jobs, {"skills": ["SQL"], "raw_text": "sql"}) == expected
+
+    stored = [{"job_id": "a", "role": "x", "job_description": "", "jd_skills": stale[0][0]}]
+    assert analyzer.attach_jd_skills(stored) == []
+    assert stored[0]["jd_skills"] == jobs[0]["jd_skills"]
+
+
+def test_broken_keyword_pool_finishes_remaining_jobs_serially(monkeypatch):
+    jobs = [{"role": "Product Manager", "company": "C%d" % i, "job_description": "Fintech SQL"} for i in range(3)]
+    expected = analyzer.analyze_jobs([dict(j) for j in jobs], PM_PREFS, {"scoring": {"use_ollama": False}})[1]
+
+    def pool_results(*args):
+        first = dict(jobs[0])
+        analyzer._analyze_job_in_worker(first, PM_PREFS, False, analyzer._normalize_preferences(PM_PREFS))
+        yield first
+        raise analyzer.BrokenProcessPool("worker killed")
+
+    monkeypatch.setattr(analyzer, "_keyword_pool_results", lambda *args: (None, pool_results()))
+    calls = []
+    _, analyzed = analyzer.analyze_jobs(
+        jobs, PM_PREFS, {"scoring": {"use_ollama": False}}, progress_callback=lambda *a: calls.append(a)
+    )
+    assert analyzed == expected
+    assert len(calls) == 3
@@ -2,7 +2,10 @@
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+from datetime import timedelta
+
 from contact_scraper import extract_contacts_from_text, enrich_jobs_with_contacts
+import contact_scraper
 
 
 def test_extract_email_from_jd():
@@ -31,3 +34,28 @@ def test_enrich_returns_dict():
     assert isinstance(result, dict)
     assert "abc123" in result
     assert result["abc123"]["poster_email"] == "hr@testco.com"
+
+
+def test_company_scrapes_are_cached_across_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(contact_scraper, "CONTACT_CACHE_PATH", str(tmp_path / "contacts.db"))
+    # Companies with no contacts expire at once, so they are scraped again
+    monkeypatch.setattr(contact_scraper, "CONTACT_CACHE_EMPTY_TTL", timedelta(0))
+    calls = []
+
+    def fake_scrape(company, apply_url):
+        calls.append(company)
+        return (["hr@acme.com"], []) if company == "Acme" else ([], [])
+
+    monkeypatch.setattr(contact_scraper, "_scrape_company_contacts", fake_scrape)
+    jobs = [
+        {"job_id": "a", "company": "Acme", "job_description": ""},
+        {"job_id": "b", "company": "acme ", "job_description": ""},
+        {"job_id": "c", "company": "Nobody", "job_description": ""},
+    ]
+    first = enrich_jobs_with_contacts(jobs)
+    assert sorted(first) == ["a", "b"]
+    assert first["b"]["poster_email"] == "hr@acme.com"
+    assert sorted(calls) == ["Acme", "Nobody"]
+
+    assert enrich_jobs_with_contacts(jobs) == first
+    assert sorted(calls) == ["Acme", "Nobody", "Nobody"]
@@ -7,7 +7,7 @@ import pytest
 # Point to a temp DB so tests don't pollute jobs.db
 os.environ.setdefault("DATA_DIR", tempfile.mkdtemp())
 
-from database import init_db, get_connection
+from database import init_db, get_connection, insert_jobs_bulk, get_distinct_portals
 
 
 def test_cv_score_column_exists():
@@ -19,3 +19,62 @@ def test_cv_score_column_exists():
     cols = [row["name"] for row in cursor.fetchall()]
     conn.close()
     assert "cv_score" in cols, f"cv_score column missing; found: {cols}"
+
+
+def test_insert_jobs_bulk_skips_exact_and_cross_portal_duplicates():
+    init_db()
+    jobs = [
+        {"portal": "linkedin", "company": "Bulkco Pvt Ltd", "role": "Product Manager", "location": "Pune"},
+        {"portal": "linkedin", "company": "Bulkco Pvt Ltd", "role": "Product Manager", "location": "Pune"},
+        {"portal": "naukri", "company": "Bulkco", "role": "Product Manager - Payments", "location": "Pune"},
+        {"portal": "naukri", "company": "Bulkco", "role": "Data Engineer", "location": "Pune"},
+    ]
+    assert insert_jobs_bulk(jobs) == (2, 2)
+    assert insert_jobs_bulk(jobs[:1]) == (0, 1)
+
+
+def test_cached_aggregates_refresh_after_a_write():
+    init_db()
+    before = get_distinct_portals()
+    assert get_distinct_portals() == before
+    insert_jobs_bulk([{"portal": "zz-cache-test", "company": "Cacheco", "role": "Analyst"}])
+    assert "zz-cache-test" in get_distinct_portals()
+
+
+def test_jobs_fts_finds_substrings_and_follows_updates():
+    init_db()
+    insert_jobs_bulk([{"portal": "p", "company": "Ftsco", "role": "Payments Product Lead",
+                       "job_description": "Own the UPI roadmap"}])
+    conn = get_connection()
+    query = "SELECT company FROM job_listings WHERE rowid IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)"
+    assert [r["company"] for r in conn.execute(query, ('"upi road"',))] == ["Ftsco"]
+    conn.execute("UPDATE job_listings SET job_description = 'Own growth' WHERE company = 'Ftsco'")
+    conn.commit()
+    assert conn.execute(query, ('"upi road"',)).fetchall() == []
+    conn.close()
+
+
+def test_location_canonical_set_on_insert_and_backfilled():
+    init_db()
+    insert_jobs_bulk([
+        {"portal": "naukri", "company": "Canonco", "role": "Growth Lead", "location": "Whitefield, Karnataka"},
+    ])
+    conn = get_connection()
+    row = conn.execute(
+        "SELECT location, location_canonical FROM job_listings WHERE company = 'Canonco'"
+    ).fetchone()
+    assert (row["location"], row["location_canonical"]) == ("Bengaluru", "Bengaluru")
+    # A row stored before the column existed is filled in by the next init_db()
+    conn.execute(
+        "UPDATE job_listings SET location = 'Andheri East', location_canonical = NULL "
+        "WHERE company = 'Canonco'"
+    )
+    conn.commit()
+    conn.close()
+    init_db()
+    conn = get_connection()
+    row = conn.execute(
+        "SELECT location_canonical FROM job_listings WHERE company = 'Canonco'"
+    ).fetchone()
+    conn.close()
+    assert row["location_canonical"] == "Mumbai"